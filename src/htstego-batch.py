@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import sys
+from libhtstego import Options, add_arguments
+
+__version__ = '1.0'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=f'Halftone Steganography Batch Utility Version {__version__}')
+    parser.add_argument('-v', '--version', action='version', version=f'%(prog)s {__version__}')
+    parser.add_argument('--manifest', type=str, required=True, help='CSV or JSON lines file with one embedding job per entry')
+
+    args_performance, args_output = add_arguments(parser, 'job')
+    args_performance.add_argument('--jobs', type=int, default=1, help='number of processes running jobs concurrently')
+    args_output.add_argument('--output-format', default='json', type=str, choices=['csv', 'json', 'xml'], help='output format')
+
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(0)
+
+    args = parser.parse_args()
+    options = Options.from_args(args, parser)
+
+    from libhtstego import htstego_batch, output_formatter, read_manifest
+
+    for num, params in enumerate(htstego_batch(read_manifest(args.manifest), workers=args.jobs, options=options)):
+        output = output_formatter(params, args.output_format)
+        if args.output_format == 'csv' and num > 0:
+            output = output.split('\n', 1)[1]
+        print(output, flush=True)
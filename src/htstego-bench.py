@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from skimage import io
+import numpy as np
+import libhtstego
+from libhtstego import HAVE_NUMBA, Options, applyErrDiff, get_kernel_list, loadKernel, output_formatter
+
+__version__ = '1.0'
+
+
+def applyErrDiffReference(I, kernelFile):
+    # the original per-pixel implementation, kept as the speed and output baseline
+    kernel = loadKernel(kernelFile)
+    kH, kW = kernel.shape
+
+    height, width = I.shape
+    pI = kW // 2
+    tI = np.zeros((height + pI*2, width + pI*2))
+    tI[pI:-pI, pI:-pI] = I
+
+    for y in range(height):
+        for x in range(width):
+            old_pixel = tI[y+pI, x+pI]
+            new_pixel = np.round(old_pixel)
+            tI[y+pI, x+pI] = new_pixel
+            err = old_pixel - new_pixel
+            tI[y:y+kH, x:x+kW] += err * kernel
+
+    return tI[pI:-pI, pI:-pI]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def peakMemory(func, *args, **kwargs):
+    # peak memory allocated by a call, in bytes; numpy allocations included
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def syntheticCover(size, seed=0):
+    # a smooth color gradient with noise, the same for every run
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    I = np.stack((x, y, (x + y) / 2), axis=-1) * 200 + rng.normal(0, 20, (size, size, 3))
+    return np.clip(I, 0, 255).astype(np.uint8)
+
+
+def syntheticPayload(size):
+    text = open('payloads/payload16384.txt', 'rb').read()
+    return (text * (size // len(text) + 1))[:size]
+
+
+def benchEngines(args):
+    I = io.imread(args.cover, as_gray=True)
+    engines = ['numpy'] + (['numba', 'wavefront'] if HAVE_NUMBA else [])
+    for engine in engines[1:]:
+        applyErrDiff(I[:8, :8], args.kernel[0], engine=engine, workers=args.workers)
+
+    for num, kernel in enumerate(args.kernel):
+        params = {'kernel': kernel, 'cover_file': args.cover, 'pixels': I.size}
+        if not args.skip_reference:
+            reference, params['time_reference'] = timed(applyErrDiffReference, I, kernel)
+        for engine in engines:
+            output, params[f'time_{engine}'] = timed(applyErrDiff, I, kernel, engine=engine, workers=args.workers)
+            if not args.skip_reference:
+                params[f'speedup_{engine}'] = round(params['time_reference'] / params[f'time_{engine}'], 2)
+                if not np.array_equal(output.view(np.int64), reference.view(np.int64)):
+                    print(f'{engine} output differs from reference for kernel {kernel}', file=sys.stderr)
+                    sys.exit(1)
+        for name in params:
+            if name.startswith('time_'):
+                params[name] = round(params[name], 4)
+        output = output_formatter(params, args.output_format)
+        if args.output_format == 'csv' and num > 0:
+            output = output.split('\n', 1)[1]
+        print(output, flush=True)
+
+
+def suiteCases(args):
+    # every method and parameter, on every cover, payload size and share count
+    methods = []
+    if 'errdiff' in args.methods:
+        methods += [('errdiff', kernel) for kernel in args.kernel]
+    if 'ordered' in args.methods:
+        methods += [('ordered', bayerN) for bayerN in args.bayer_size]
+    if 'pattern' in args.methods:
+        methods += [('pattern', None)]
+
+    covers = [(f'synthetic{size}', syntheticCover(size)) for size in args.cover_size]
+    covers += [(cover, io.imread(cover)) for cover in args.covers]
+    for coverName, cover in covers:
+        for outputColor in args.output_color:
+            for method, parameter in methods:
+                for payloadSize in args.payload_size:
+                    for nshares in args.nshares:
+                        yield coverName, cover, outputColor, method, parameter, payloadSize, nshares
+
+
+def benchCase(args, coverName, cover, outputColor, method, parameter, payloadSize, nshares):
+    embed = getattr(libhtstego, f'htstego_{method}_shares')
+    extract = getattr(libhtstego, f'htstego_{method}_extract_shares')
+    embedArgs = (nshares, cover, syntheticPayload(payloadSize)) + (() if parameter is None else (parameter,)) + (outputColor,)
+    options = Options(metrics=args.metrics, workers=args.workers)
+    M, N = cover.shape[:2]
+    params = {
+        'case': '-'.join(str(part) for part in (method, parameter, coverName, outputColor, f'msg{payloadSize}', f'{nshares}shares') if part is not None),
+        'halftoning_method': method,
+        'errdiff_kernel': parameter if method == 'errdiff' else 'N/A',
+        'bayer_size': parameter if method == 'ordered' else 'N/A',
+        'output_color': outputColor,
+        'cover_file': coverName,
+        'pixels': M * N,
+        'payload_size': payloadSize,
+        'number_of_shares': nshares
+    }
+
+    # the random choices of every repetition are the same
+    np.random.seed(0)
+    result = embed(*embedArgs, options=options)
+    params['status'] = result[0]
+    if result[0] != 'ok':
+        return params
+
+    times = []
+    for _ in range(args.repeat):
+        np.random.seed(0)
+        times.append(timed(embed, *embedArgs, options=options)[1])
+    params['time_embed'] = min(times)
+    shares = result[1]
+    payload, params['time_extract'] = min((timed(extract, shares, True) for _ in range(args.repeat)), key=lambda r: r[1])
+    params['payload_recovered'] = payload == embedArgs[2]
+    if not args.skip_memory:
+        np.random.seed(0)
+        params['peak_memory_embed'] = peakMemory(embed, *embedArgs, options=options)
+        params['peak_memory_extract'] = peakMemory(extract, shares, True)
+    params['pixels_per_second'] = round(M * N / params['time_embed'])
+    params['bits_per_second'] = round(8 * payloadSize / params['time_embed'])
+    params['time_embed'] = round(params['time_embed'], 6)
+    params['time_extract'] = round(params['time_extract'], 6)
+    return params
+
+
+def compareBaseline(params, baseline, tolerance):
+    # ratios of the current times to the baseline ones; a ratio above
+    # 1 + tolerance is a regression
+    regressed = False
+    previous = baseline.get(params['case'])
+    if previous is None or params['status'] != 'ok' or previous.get('status') != 'ok':
+        return False
+    for stage in ('embed', 'extract'):
+        ratio = params[f'time_{stage}'] / max(previous[f'time_{stage}'], 1e-9)
+        params[f'baseline_time_{stage}'] = previous[f'time_{stage}']
+        params[f'ratio_{stage}'] = round(ratio, 3)
+        regressed |= ratio > 1 + tolerance
+    params['regression'] = regressed
+    return regressed
+
+
+def benchSuite(args):
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = {params['case']: params for params in json.load(file)['results']}
+
+    # compile the engines before the first timed case
+    if HAVE_NUMBA:
+        applyErrDiff(np.zeros((8, 8)), args.kernel[0], engine='numba')
+
+    results = []
+    regressions = 0
+    for case in suiteCases(args):
+        params = benchCase(args, *case)
+        regressions += compareBaseline(params, baseline, args.tolerance)
+        results.append(params)
+        output = output_formatter(params, args.output_format)
+        if args.output_format == 'csv' and len(results) > 1:
+            output = output.split('\n', 1)[1]
+        print(output, flush=True)
+
+    if args.results:
+        environment = {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'numba': HAVE_NUMBA,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'repeat': args.repeat,
+            'metrics': args.metrics
+        }
+        with open(args.results, 'w') as file:
+            json.dump({'environment': environment, 'results': results}, file, indent=2)
+
+    if regressions:
+        print(f'{regressions} cases are more than {args.tolerance:.0%} slower than the baseline', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=f'Halftone Steganography Benchmark Utility Version {__version__}')
+    parser.add_argument('-v', '--version', action='version', version=f'%(prog)s {__version__}')
+    parser.add_argument('--cover', type=str, default='cover_imgs/airplane80.tif', help='input image')
+    parser.add_argument('--kernel', type=str, nargs='+', choices=get_kernel_list(), default=sorted(get_kernel_list()), help='error diffusion kernels to benchmark')
+    parser.add_argument('--skip-reference', action='store_true', help='do not run the original per-pixel implementation')
+    parser.add_argument('--output-format', default='csv', type=str, choices=['csv', 'json', 'xml'], help='output format')
+    parser.add_argument('--workers', type=int, default=4, help='number of threads for the wavefront engine')
+
+    args_suite = parser.add_argument_group('Suite Options')
+    args_suite.add_argument('--suite', action='store_true', help='benchmark embedding and extraction instead of the error diffusion engines')
+    args_suite.add_argument('--methods', type=str, nargs='+', choices=['errdiff', 'ordered', 'pattern'], default=['errdiff', 'ordered', 'pattern'], help='halftoning methods to benchmark')
+    args_suite.add_argument('--bayer-size', type=int, nargs='+', choices=[2, 4, 8], default=[2, 4, 8], help='bayer matrix sizes to benchmark')
+    args_suite.add_argument('--payload-size', type=int, nargs='+', default=[128, 1024, 8192], help='payload sizes in bytes')
+    args_suite.add_argument('--nshares', type=int, nargs='+', default=[3, 4], help='numbers of shares')
+    args_suite.add_argument('--cover-size', type=int, nargs='+', default=[256, 1024], help='sizes of synthetic square covers')
+    args_suite.add_argument('--covers', type=str, nargs='*', default=[], help='cover images to benchmark besides the synthetic ones')
+    args_suite.add_argument('--output-color', type=str, nargs='+', choices=['binary', 'color'], default=['binary'], help='output colors')
+    args_suite.add_argument('--metrics', type=str, choices=['none', 'fast', 'full'], default='none', help='quality metrics computed while embedding')
+    args_suite.add_argument('--repeat', type=int, default=3, help='number of timed runs of each case, the fastest of which is reported')
+    args_suite.add_argument('--skip-memory', action='store_true', help='do not measure peak memory')
+    args_suite.add_argument('--results', type=str, help='JSON file to write the results to')
+    args_suite.add_argument('--baseline', type=str, help='JSON results file to compare the times against')
+    args_suite.add_argument('--tolerance', type=float, default=0.1, help='slowdown relative to the baseline that counts as a regression')
+    args = parser.parse_args()
+
+    if args.suite:
+        benchSuite(args)
+    else:
+        benchEngines(args)
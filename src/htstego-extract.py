@@ -20,7 +20,6 @@
 
 import argparse
 import sys
-from libhtstego import htstego_errdiff_extract, htstego_ordered_extract, htstego_pattern_extract
 
 __version__ = '1.0'
 
@@ -37,6 +36,8 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=f'Halftone Steganography Extraction Utility Version {__version__}', parents=[gui_parser])
     parser.add_argument('--extract-from', required=True, type=str, help='extract from images in this directory')
     parser.add_argument('--htmethod', type=str, required=True, choices=['errdiff', 'ordered', 'pattern'], help='halftoning method')
+    parser.add_argument('--output', type=str, help='write the payload to this file as it is, instead of printing it as text')
+    parser.add_argument('--cache', action='store_true', help='decode the images once into a memory-mapped .npy file beside the directory and reuse it')
 
     if len(sys.argv) == 1:
         parser.print_help()
@@ -44,10 +45,19 @@ if __name__ == '__main__':
 
     args = parser.parse_args(args_second)
 
+    from libhtstego import htstego_errdiff_extract, htstego_ordered_extract, htstego_pattern_extract
+
     dirName = args.extract_from if args.extract_from else 'output'
+    binary = args.output is not None
     if args.htmethod == 'errdiff':
-        print(htstego_errdiff_extract(dirName))
+        payload = htstego_errdiff_extract(dirName, binary, args.cache)
     elif args.htmethod == 'ordered':
-        print(htstego_ordered_extract(dirName))
+        payload = htstego_ordered_extract(dirName, binary, args.cache)
     elif args.htmethod == 'pattern':
-        print(htstego_pattern_extract(dirName))
+        payload = htstego_pattern_extract(dirName, binary, args.cache)
+
+    if binary and payload is not None:
+        with open(args.output, 'wb') as file:
+            file.write(payload)
+    else:
+        print('Cannot extract payload' if payload is None else payload)
@@ -18,13 +18,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import settings
-from libhtstego import get_kernel_list, htstego_errdiff, htstego_ordered, htstego_pattern, output_formatter
+from libhtstego import Options, get_kernel_list, htstego_errdiff, htstego_ordered, htstego_pattern, output_formatter
 import tkinter as tk
 from tkinter import filedialog, ttk
 
 __version__ = '1.0'
-settings.init()
 
 
 def update_htoptions():
@@ -59,19 +57,15 @@ def browse_payload():
 
 
 def generate_output():
-    settings.nofileout = bool(nooutputfiles_var.get())
-    settings.regularoutput = bool(regularoutput_var.get())
-    settings.nostdout = False
-    settings.outputformat = outputformat_var.get()
-    settings.compress = compress_var.get()
+    options = Options(nofileout=bool(nooutputfiles_var.get()), regularoutput=bool(regularoutput_var.get()), compress=bool(compress_var.get()))
 
     result_text.delete(1.0, tk.END)
     if htmethod_var.get() == 'errdiff':
-        ret_msg, avg_snr, avg_psnr, avg_ssim = htstego_errdiff(NSHARES=int(nshares_entry.get()), coverFile=cover_entry.get(), payloadFile=payload_entry.get(), errDiffMethod=errdiffmethod_var.get(), outputMode=outputmode_var.get())
+        ret_msg, avg_snr, avg_psnr, avg_ssim = htstego_errdiff(NSHARES=int(nshares_entry.get()), coverFile=cover_entry.get(), payloadFile=payload_entry.get(), errDiffMethod=errdiffmethod_var.get(), outputMode=outputmode_var.get(), options=options)
     elif htmethod_var.get() == 'ordered':
-        ret_msg, avg_snr, avg_psnr, avg_ssim = htstego_ordered(NSHARES=int(nshares_entry.get()), coverFile=cover_entry.get(), payloadFile=payload_entry.get(), bayerN=int(bayersize_var.get()), outputMode=outputmode_var.get())
+        ret_msg, avg_snr, avg_psnr, avg_ssim = htstego_ordered(NSHARES=int(nshares_entry.get()), coverFile=cover_entry.get(), payloadFile=payload_entry.get(), bayerN=int(bayersize_var.get()), outputMode=outputmode_var.get(), options=options)
     else:
-        ret_msg, avg_snr, avg_psnr, avg_ssim = htstego_pattern(NSHARES=int(nshares_entry.get()), coverFile=cover_entry.get(), payloadFile=payload_entry.get(), outputMode=outputmode_var.get())
+        ret_msg, avg_snr, avg_psnr, avg_ssim = htstego_pattern(NSHARES=int(nshares_entry.get()), coverFile=cover_entry.get(), payloadFile=payload_entry.get(), outputMode=outputmode_var.get(), options=options)
     params = {
         'status': ret_msg,
         'halftoning_method': htmethod_var.get(),
@@ -81,12 +75,12 @@ def generate_output():
         'number_of_shares': nshares_entry.get(),
         'cover_file': cover_entry.get(),
         'payload_file': payload_entry.get(),
-        'payload_compression': settings.compress,
+        'payload_compression': options.compress,
         'avg_snr': round(avg_snr, 4),
         'avg_psnr': round(avg_psnr, 4),
         'avg_ssim': round(avg_ssim, 4)
     }
-    result_text.insert(tk.END, output_formatter(params, settings.outputformat))
+    result_text.insert(tk.END, output_formatter(params, outputformat_var.get()))
 
 
 w = tk.Tk()
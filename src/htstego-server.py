@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import sys
+from libhtstego import Options, add_arguments
+
+__version__ = '1.0'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=f'Halftone Steganography Server Version {__version__}')
+    parser.add_argument('-v', '--version', action='version', version=f'%(prog)s {__version__}')
+
+    args_server = parser.add_argument_group('Server Options')
+    args_server.add_argument('--host', type=str, default='127.0.0.1', help='address to listen on')
+    args_server.add_argument('--port', type=int, default=8000, help='port to listen on')
+    args_server.add_argument('--unix-socket', type=str, help='listen on this Unix socket instead of a port')
+    args_server.add_argument('--queue-size', type=int, default=16, help='number of requests waiting for a worker before new ones are refused')
+
+    args_performance, args_output = add_arguments(parser, 'request')
+    args_performance.add_argument('--jobs', type=int, default=1, help='number of worker processes running requests concurrently')
+
+    args = parser.parse_args()
+    options = Options.from_args(args, parser)
+
+    from libhtstego import htstego_server
+
+    server = htstego_server(args.host, args.port, args.unix_socket, args.jobs, args.queue_size, options)
+    print(f'Listening on {args.unix_socket or f"http://{args.host}:{args.port}"}', file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,66 @@
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import importlib
+
+__version__ = '1.0'
+
+# the public names and the modules they live in; modules are only imported
+# when one of their names is first used, so that listing kernels or parsing
+# command line options does not load numpy, scikit-image or numba
+_exports = {
+    'Options': 'options',
+    'add_arguments': 'options',
+    'StageRecorder': 'profiling',
+    'get_kernel_list': 'registry',
+    'loadKernel': 'registry',
+    'applyErrDiff': 'errdiff',
+    'applyErrDiffChannels': 'errdiff',
+    'HAVE_NUMBA': 'errdiff',
+    'htstego_errdiff': 'embed',
+    'htstego_ordered': 'embed',
+    'htstego_pattern': 'embed',
+    'htstego_errdiff_shares': 'embed',
+    'htstego_ordered_shares': 'embed',
+    'htstego_pattern_shares': 'embed',
+    'encode_shares': 'shares',
+    'htstego_job': 'batch',
+    'htstego_batch': 'batch',
+    'read_manifest': 'batch',
+    'htstego_errdiff_extract': 'extract',
+    'htstego_ordered_extract': 'extract',
+    'htstego_pattern_extract': 'extract',
+    'htstego_errdiff_extract_shares': 'extract',
+    'htstego_ordered_extract_shares': 'extract',
+    'htstego_pattern_extract_shares': 'extract',
+    'output_formatter': 'output',
+    'htstego_server': 'server',
+    'AsyncHTStego': 'aio'
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name in _exports:
+        return getattr(importlib.import_module(f'.{_exports[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
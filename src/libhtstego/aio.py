@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asyncio
+import importlib
+from .batch import startWorkers
+
+
+def _runNamed(name, args, kwargs):
+    return getattr(importlib.import_module(__package__), name)(*args, **kwargs)
+
+
+class AsyncHTStego:
+    # Runs the htstego_* functions from asyncio code. Every call, including
+    # its reading of covers and payloads and its writing of shares, runs in
+    # one of jobs warm worker processes, so the event loop never blocks. At
+    # most limit calls are submitted at once and the others wait their turn.
+    # Cancelling a call that has not started yet drops it; a call that has
+    # started finishes in its worker, and holds its slot until it does.
+    # The workers are started by start(), by async with or by the first
+    # call, in a thread, so that the event loop keeps running meanwhile.
+    def __init__(self, jobs=1, limit=None):
+        self.jobs = jobs
+        self.executor = None
+        self.starting = None
+        self.slots = asyncio.Semaphore(limit or jobs)
+
+    async def start(self):
+        if self.starting is None:
+            self.starting = asyncio.get_running_loop().run_in_executor(None, startWorkers, self.jobs)
+        self.executor = await asyncio.shield(self.starting)
+        return self
+
+    async def run(self, name, *args, **kwargs):
+        if not name.startswith('htstego_'):
+            raise ValueError(f'{name} is not an htstego function')
+
+        if self.executor is None:
+            await self.start()
+        await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(_runNamed, name, args, kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        def release(_):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self.slots.release)
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def __getattr__(self, name):
+        # client.htstego_errdiff(...) and so on, for every htstego_* function
+        if not name.startswith('htstego_'):
+            raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+        async def call(*args, **kwargs):
+            return await self.run(name, *args, **kwargs)
+        return call
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        # workers still starting are shut down once they have started
+        if self.starting is not None:
+            await asyncio.wait([self.starting])
+            if not self.starting.cancelled() and self.starting.exception() is None:
+                self.executor = self.starting.result()
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
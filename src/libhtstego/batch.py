@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import csv
+import importlib
+import json
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from .embed import htstego_errdiff, htstego_errdiff_shares, htstego_ordered, htstego_ordered_shares, htstego_pattern, htstego_pattern_shares
+from .options import Options
+from .profiling import StageRecorder, profileStages
+
+
+def jobCompress(job, options):
+    # blank cells, as in CSV job lists, leave --compress-payload in effect
+    compress = job.get('compress_payload')
+    if compress in (None, ''):
+        return options.compress
+    return str(compress).lower() in ('1', 'true', 'yes')
+
+
+def htstego_job(job, options=None, returnShares=False):
+    # runs one embedding job given as a dict keyed by htstego.py option names;
+    # with returnShares the shares are returned in the result instead of
+    # being written
+    options = options or Options()
+    htmethod = job['htmethod']
+    nshares = int(job['nshares'])
+    kernel = job.get('kernel') or None
+    bayerSize = int(job.get('bayer_size') or 8)
+    outputColor = job.get('output_color') or 'binary'
+    codecLevel = job.get('codec_level')
+    options = options.replace(
+        compress=jobCompress(job, options),
+        codec=job.get('codec') or options.codec,
+        codeclevel=options.codeclevel if codecLevel in (None, '') else int(codecLevel)
+    )
+    # profiled stages are added to the result and passed on to any hook set
+    recorder = None
+    if options.profile != 'none':
+        recorder = StageRecorder(options.profilehook)
+        options = options.replace(profilehook=recorder)
+    # so are the paths of the images written
+    outputFiles = []
+    outputHook = options.outputhook
+
+    def recordOutputs(paths):
+        outputFiles.extend(paths)
+        if outputHook is not None:
+            outputHook(paths)
+    options = options.replace(outputhook=recordOutputs)
+
+    if htmethod == 'errdiff':
+        if kernel is None:
+            raise ValueError('kernel is required when htmethod is errdiff')
+        embed, parameter = (htstego_errdiff_shares if returnShares else htstego_errdiff), (kernel,)
+    elif htmethod == 'ordered':
+        embed, parameter = (htstego_ordered_shares if returnShares else htstego_ordered), (bayerSize,)
+    elif htmethod == 'pattern':
+        embed, parameter = (htstego_pattern_shares if returnShares else htstego_pattern), ()
+    else:
+        raise ValueError(f'unknown halftoning method {htmethod}')
+
+    if returnShares:
+        ret_msg, shares, avg_snr, avg_psnr, avg_ssim = embed(nshares, job['cover'], job['payload'], *parameter, outputColor, options=options)
+    else:
+        ret_msg, avg_snr, avg_psnr, avg_ssim = embed(nshares, job['cover'], job['payload'], *parameter, outputColor, options=options)
+
+    params = {
+        'status': ret_msg,
+        'halftoning_method': htmethod,
+        'errdiff_kernel': kernel if htmethod == 'errdiff' else 'N/A',
+        'bayer_size': bayerSize if htmethod == 'ordered' else 'N/A',
+        'output_color': outputColor,
+        'number_of_shares': nshares,
+        'cover_file': job['cover'],
+        'payload_file': job['payload'],
+        'payload_compression': options.compress,
+        'output_files': ';'.join(outputFiles) or 'N/A',
+        'avg_snr': 'N/A' if np.isnan(avg_snr) else round(avg_snr, 4),
+        'avg_psnr': 'N/A' if np.isnan(avg_psnr) else round(avg_psnr, 4),
+        'avg_ssim': 'N/A' if np.isnan(avg_ssim) else round(avg_ssim, 4)
+    }
+    if recorder is not None:
+        params.update(recorder.params(profileStages(options, returnShares), options.profile == 'memory'))
+    if returnShares:
+        params['shares'] = shares
+    return params
+
+
+def read_manifest(manifestFile):
+    # batch jobs, one per CSV row (with a header line) or per JSON line
+    with open(manifestFile, newline='') as file:
+        if manifestFile.lower().endswith('.csv'):
+            return [dict(row) for row in csv.DictReader(file)]
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _runBatchJob(job, options):
+    try:
+        return htstego_job(job, options)
+    except Exception as e:
+        params = {
+            'status': f'error: {e}',
+            'halftoning_method': job.get('htmethod'),
+            'errdiff_kernel': 'N/A',
+            'bayer_size': 'N/A',
+            'output_color': job.get('output_color') or 'binary',
+            'number_of_shares': job.get('nshares'),
+            'cover_file': job.get('cover'),
+            'payload_file': job.get('payload'),
+            'payload_compression': jobCompress(job, options),
+            'output_files': 'N/A',
+            'avg_snr': 0,
+            'avg_psnr': 0,
+            'avg_ssim': 0
+        }
+        if options.profile != 'none':
+            params.update(StageRecorder().params(profileStages(options), options.profile == 'memory'))
+        return params
+
+
+def htstego_batch(jobs, workers=1, options=None):
+    # yields one result per job, in job order, as soon as it is available;
+    # every worker process keeps its imports and parsed state across jobs
+    options = options or Options()
+    if workers <= 1:
+        yield from map(_runBatchJob, jobs, repeat(options))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_runBatchJob, jobs, repeat(options))
+
+
+def initWorker():
+    # load everything an embedding needs once, so that no call pays for the
+    # imports or for compiling the halftoning engines; Ctrl-C is left to the
+    # parent process, which shuts the workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in ('skimage.io', 'skimage.color', 'skimage.metrics', f'{__package__}.extract'):
+        importlib.import_module(module)
+    from .errdiff import HAVE_NUMBA, compiledEngines
+    if HAVE_NUMBA:
+        compiledEngines()
+
+
+def warmWorker():
+    return os.getpid()
+
+
+def startWorkers(jobs):
+    # a pool of jobs worker processes, all started and warmed up before it
+    # is returned, so that the first calls find them ready
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=initWorker)
+    for future in [executor.submit(warmWorker) for _ in range(jobs)]:
+        future.result()
+    return executor
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from .errdiff import applyErrDiffChannels
+from .halftone import PATTERNS, countBWBlocks, findEmbedBlocksPat, findEmbedPositionErrDiff, findEmbedPositionsOrdered, orderedThreshold, renderPatterns
+from .options import Options
+from .profiling import stage
+from .payload import readMessage
+from .shares import coverName, generateOutputDirectory, readCover, savePNG, shareMetrics, shareStack, writeShares
+from .stream import htstego_errdiff_stream, htstego_ordered_stream, htstego_pattern_stream
+
+
+def embedErrDiff(NSHARES, coverFile, payloadFile, errDiffMethod, outputMode, options):
+    # the halftone, the deltas of its shares and the payload size, or an
+    # error message
+    with stage(options, 'read'):
+        if outputMode == 'binary':
+            I = readCover(coverFile, as_gray=True)
+            I = np.expand_dims(I, axis=-1)
+        else:
+            I = readCover(coverFile) / 255.0
+
+        if outputMode == 'color' and len(I.shape) < 3:
+            return 'cannot generate color output from grayscale input', None, None, 0
+
+        M, N, C = I.shape
+
+        messageBinary, payloadBytes = readMessage(payloadFile, options)
+
+    blockSize = M * N // len(messageBinary)
+    if blockSize == 0:
+        return 'payload too long', None, None, 0
+    blockSize = min(blockSize, options.blocksize or blockSize)
+
+    with stage(options, 'halftone'):
+        halftone = applyErrDiffChannels(I, errDiffMethod, options.workers)
+
+    with stage(options, 'embed'):
+        linearImage = halftone.reshape(M * N, C)
+        stegoPixels = (messageBinary * 255).tolist()
+        embedded = []
+
+        messagePos = 0
+        for i in range(0, M * N, blockSize):
+            if messagePos < len(messageBinary):
+                stegoPixel = stegoPixels[messagePos]
+
+                randomChannel = np.random.randint(C)
+
+                if i + blockSize - 1 > M * N:
+                    break
+
+                currentBlock = linearImage[i:i + blockSize, randomChannel]
+
+                embedHere = findEmbedPositionErrDiff(currentBlock, stegoPixel)
+                if embedHere == -1:
+                    continue
+
+                randomShare = np.random.randint(NSHARES)
+                embedded.append((randomShare, (i + embedHere) * C + randomChannel, stegoPixel))
+                messagePos += 1
+            else:
+                break
+
+        deltas = np.array(embedded, dtype=np.int64).reshape(-1, 3).T
+    # blocks without a pixel to carry their bit are skipped, so the cover
+    # can run out before the whole payload is embedded
+    if messagePos < len(messageBinary):
+        return 'payload too long', None, None, 0
+    return 'ok', halftone, deltas, payloadBytes
+
+
+def embedOrdered(NSHARES, coverFile, payloadFile, bayerN, outputMode, options):
+    with stage(options, 'read'):
+        if outputMode == 'binary':
+            I = readCover(coverFile, as_gray=True)
+            I = np.expand_dims(I, axis=-1)
+        else:
+            I = readCover(coverFile) / 255.0
+
+        if outputMode == 'color' and len(I.shape) < 3:
+            return 'cannot generate color output from grayscale input', None, None, 0
+
+        M, N, C = I.shape
+
+        messageBinary, payloadBytes = readMessage(payloadFile, options)
+
+    blockSize = M * N // len(messageBinary)
+    if blockSize == 0:
+        return 'payload too long', None, None, 0
+    blockSize = min(blockSize, options.blocksize or blockSize)
+
+    with stage(options, 'halftone'):
+        threshold = orderedThreshold(bayerN, 0, M, N)
+        halftone = np.where(I > threshold[:, :, np.newaxis], 255, 0).astype(np.uint8)
+
+    # every embedded pixel is set in all shares, to the bit in one of them
+    # and to its inverse in the others
+    with stage(options, 'embed'):
+        positions, sP, rC, rO = findEmbedPositionsOrdered(messageBinary, blockSize, C, NSHARES)
+        deltas = (np.repeat(np.arange(NSHARES), len(positions)), np.tile(positions * C + rC, NSHARES), np.where(np.arange(NSHARES)[:, np.newaxis] == rO, sP, 255 - sP).ravel())
+    return 'ok', halftone, deltas, payloadBytes
+
+
+def embedPattern(NSHARES, coverFile, payloadFile, outputMode, options):
+    with stage(options, 'read'):
+        if outputMode == 'binary':
+            I = (readCover(coverFile, as_gray=True) * 255).astype(np.uint8) // 26
+            I = np.expand_dims(I, axis=-1)
+        else:
+            I = readCover(coverFile) // 26
+        M, N, C = I.shape
+
+        messageBinary, payloadBytes = readMessage(payloadFile, options)
+
+    nrOfBlocks = M * N
+    bwBlocks = countBWBlocks(I)
+    nrOfUsableBlocks = nrOfBlocks - bwBlocks
+    blockSize = nrOfUsableBlocks // len(messageBinary)
+    if blockSize == 0:
+        return 'payload too long', None, None, 0
+    blockSize = min(blockSize, options.blocksize or blockSize)
+
+    with stage(options, 'halftone'):
+        halftone = renderPatterns(I)
+
+    with stage(options, 'embed'):
+        levels = np.zeros((-(-nrOfBlocks // blockSize) * blockSize, C), dtype=I.dtype)
+        levels[:nrOfBlocks] = I.reshape(nrOfBlocks, C)
+        embedBlocks, embedChannels = findEmbedBlocksPat(levels, blockSize, len(messageBinary))
+        bits = messageBinary[:len(embedBlocks)] == 1
+        newLevels = levels[embedBlocks, embedChannels] + np.where(bits, 1, -1)
+        shares = np.random.randint(NSHARES, size=len(embedBlocks))
+
+        # each embedded block replaces the nine pixels of its pattern
+        r, c = np.indices((3, 3)).reshape(2, 1, 9)
+        pixels = (3 * (embedBlocks // N)[:, np.newaxis] + r) * 3 * N + 3 * (embedBlocks % N)[:, np.newaxis] + c
+        deltas = (np.repeat(shares, 9), (pixels * C + embedChannels[:, np.newaxis]).ravel(), PATTERNS[newLevels].ravel())
+    if len(embedBlocks) < len(messageBinary):
+        return 'payload too long', None, None, 0
+    return 'ok', halftone, deltas, payloadBytes
+
+
+def writeOutputs(halftone, deltas, NSHARES, coverFile, payloadBytes, outputMode, method, suffix, options):
+    # output images are named after the cover, the method and its parameter
+    if options.nofileout == True:
+        return []
+
+    with stage(options, 'write'):
+        outDir = generateOutputDirectory(options.outputdir)
+        imfile = coverName(coverFile)
+        outputPaths = []
+        if options.regularoutput == True:
+            normalOutput = halftone[:, :, 0] if outputMode == 'binary' else halftone
+            normalOutputPath = f'{outDir}/{imfile}_{method}{outputMode[:3]}_regular{suffix}.png'
+            outputPaths.append(savePNG(normalOutputPath, normalOutput, options.pnglevel))
+        stegoOutputPaths = [f'{outDir}/{imfile}_{method}{outputMode[:3]}_stego_msg{payloadBytes}_{i+1}of{NSHARES}{suffix}.png' for i in range(NSHARES)]
+        outputPaths += writeShares(halftone, deltas, stegoOutputPaths, outputMode, options.pngworkers, options.pnglevel)
+    if options.outputhook is not None:
+        options.outputhook(outputPaths)
+    return outputPaths
+
+
+def averageMetrics(halftone, deltas, NSHARES, options):
+    with stage(options, 'metrics'):
+        results = shareMetrics(halftone, deltas, NSHARES, options.metrics, options.workers)
+    avg_snr = np.mean(results[:, 0])
+    avg_psnr = np.mean(results[:, 1])
+    avg_ssim = np.mean(results[:, 2])
+    return avg_snr, avg_psnr, avg_ssim
+
+
+def htstego_errdiff(NSHARES, coverFile, payloadFile, errDiffMethod, outputMode, options=None):
+    options = options or Options()
+    if options.stripheight > 0:
+        return htstego_errdiff_stream(NSHARES, coverFile, payloadFile, errDiffMethod, outputMode, options)
+
+    ret_msg, halftone, deltas, payloadBytes = embedErrDiff(NSHARES, coverFile, payloadFile, errDiffMethod, outputMode, options)
+    if ret_msg != 'ok':
+        return ret_msg, 0, 0, 0
+    writeOutputs(halftone, deltas, NSHARES, coverFile, payloadBytes, outputMode, 'hterrdiff', f'_{errDiffMethod}', options)
+    return ('ok',) + averageMetrics(halftone, deltas, NSHARES, options)
+
+
+def htstego_ordered(NSHARES, coverFile, payloadFile, bayerN, outputMode, options=None):
+    options = options or Options()
+    if options.stripheight > 0:
+        return htstego_ordered_stream(NSHARES, coverFile, payloadFile, bayerN, outputMode, options)
+
+    ret_msg, halftone, deltas, payloadBytes = embedOrdered(NSHARES, coverFile, payloadFile, bayerN, outputMode, options)
+    if ret_msg != 'ok':
+        return ret_msg, 0, 0, 0
+    writeOutputs(halftone, deltas, NSHARES, coverFile, payloadBytes, outputMode, 'htordered', f'_bayer{bayerN}', options)
+    return ('ok',) + averageMetrics(halftone, deltas, NSHARES, options)
+
+
+def htstego_pattern(NSHARES, coverFile, payloadFile, outputMode, options=None):
+    options = options or Options()
+    if options.stripheight > 0:
+        return htstego_pattern_stream(NSHARES, coverFile, payloadFile, outputMode, options)
+
+    ret_msg, halftone, deltas, payloadBytes = embedPattern(NSHARES, coverFile, payloadFile, outputMode, options)
+    if ret_msg != 'ok':
+        return ret_msg, 0, 0, 0
+    writeOutputs(halftone, deltas, NSHARES, coverFile, payloadBytes, outputMode, 'htpat', '', options)
+    return ('ok',) + averageMetrics(halftone, deltas, NSHARES, options)
+
+
+# The *_shares variants take the cover and payload as arrays or bytes as
+# well as file names and return the shares as an (S, M, N) or (S, M, N, C)
+# uint8 array instead of writing them, followed by the average metrics.
+def htstego_errdiff_shares(NSHARES, cover, payload, errDiffMethod, outputMode, options=None):
+    options = options or Options()
+    ret_msg, halftone, deltas, payloadBytes = embedErrDiff(NSHARES, cover, payload, errDiffMethod, outputMode, options)
+    if ret_msg != 'ok':
+        return ret_msg, None, 0, 0, 0
+    with stage(options, 'write'):
+        shares = shareStack(halftone, deltas, NSHARES, outputMode)
+    return ('ok', shares) + averageMetrics(halftone, deltas, NSHARES, options)
+
+
+def htstego_ordered_shares(NSHARES, cover, payload, bayerN, outputMode, options=None):
+    options = options or Options()
+    ret_msg, halftone, deltas, payloadBytes = embedOrdered(NSHARES, cover, payload, bayerN, outputMode, options)
+    if ret_msg != 'ok':
+        return ret_msg, None, 0, 0, 0
+    with stage(options, 'write'):
+        shares = shareStack(halftone, deltas, NSHARES, outputMode)
+    return ('ok', shares) + averageMetrics(halftone, deltas, NSHARES, options)
+
+
+def htstego_pattern_shares(NSHARES, cover, payload, outputMode, options=None):
+    options = options or Options()
+    ret_msg, halftone, deltas, payloadBytes = embedPattern(NSHARES, cover, payload, outputMode, options)
+    if ret_msg != 'ok':
+        return ret_msg, None, 0, 0, 0
+    with stage(options, 'write'):
+        shares = shareStack(halftone, deltas, NSHARES, outputMode)
+    return ('ok', shares) + averageMetrics(halftone, deltas, NSHARES, options)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import importlib.util
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from .registry import loadKernel
+
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+prange = range
+
+
+def kernelTaps(kernel):
+    # kernel weights as (row, column, weight) arrays in raster order; zero
+    # weights are kept since adding a signed zero can flip the sign of a zero
+    # output pixel, and the output has to match the per-pixel loop bit for bit
+    tapY, tapX = np.indices(kernel.shape).reshape(2, -1)
+    return tapY.astype(np.int64), tapX.astype(np.int64), kernel[tapY, tapX].astype(np.float64)
+
+
+def _errDiffScan(tI, height, width, tapY, tapX, tapW):
+    pI = (tI.shape[1] - width) // 2
+    for y in range(height):
+        for x in range(width):
+            old_pixel = tI[y + pI, x + pI]
+            new_pixel = np.round(old_pixel)
+            tI[y + pI, x + pI] = new_pixel
+            err = old_pixel - new_pixel
+            for t in range(tapW.shape[0]):
+                tI[y + tapY[t], x + tapX[t]] += err * tapW[t]
+
+
+def _errDiffRows(tI, height, width, tapY, tapX, tapW):
+    # Every pixel must receive its error contributions in the raster order of
+    # the pixels they come from, exactly as the per-pixel loop adds them.
+    # Taps on the current row are applied with a scalar scan; the others are
+    # added one whole row at a time, rightmost tap first, once the row is done.
+    pI = (tI.shape[1] - width) // 2
+    rowTaps = [(int(tapX[t]) - pI, float(tapW[t])) for t in range(len(tapW)) if tapY[t] == pI]
+    otherTaps = [(int(tapY[t]), int(tapX[t]), tapW[t]) for t in range(len(tapW)) if tapY[t] != pI]
+    otherTaps.sort(key=lambda tap: -tap[1])
+
+    for y in range(height):
+        row = tI[y + pI].tolist()
+        err = [0.0] * width
+        for x in range(pI, pI + width):
+            old_pixel = row[x]
+            new_pixel = math.copysign(round(old_pixel), old_pixel)
+            row[x] = new_pixel
+            e = old_pixel - new_pixel
+            err[x - pI] = e
+            for dx, w in rowTaps:
+                row[x + dx] += e * w
+        tI[y + pI] = row
+
+        err = np.array(err)
+        for ty, tx, w in otherTaps:
+            tI[y + ty, tx:tx + width] += err * w
+
+
+def _errDiffWavefront(I, tapDY, tapDX, tapW, nForward, blockW, out, err):
+    # Pixels gather the error of the pixels before them instead of having it
+    # scattered onto them, so concurrent rows never write to shared pixels.
+    # Row y handles column block b at step b + 2y, which is after the blocks
+    # its forward taps read from in the rows above have been finished.
+    height, width = I.shape
+    nBlocks = (width + blockW - 1) // blockW
+    for step in range(nBlocks + 2 * (height - 1)):
+        yFirst = max(0, (step - nBlocks + 2) // 2)
+        yLast = min(height - 1, step // 2)
+        for y in prange(yFirst, yLast + 1):
+            b = step - 2 * y
+            for x in range(b * blockW, min(width, (b + 1) * blockW)):
+                old_pixel = I[y, x]
+                for t in range(nForward):
+                    sy = y - tapDY[t]
+                    sx = x - tapDX[t]
+                    if sy >= 0 and sx >= 0 and sx < width:
+                        old_pixel += err[sy, sx] * tapW[t]
+                new_pixel = np.round(old_pixel)
+                out[y, x] = new_pixel
+                err[y, x] = old_pixel - new_pixel
+
+    # the remaining taps land on pixels that were already quantized
+    for y in prange(height):
+        for x in range(width):
+            for t in range(nForward, tapW.shape[0]):
+                sy = y - tapDY[t]
+                sx = x - tapDX[t]
+                if sy < height and sx >= 0 and sx < width:
+                    out[y, x] += err[sy, sx] * tapW[t]
+
+
+def wavefrontTaps(kernel):
+    # taps as offsets from the anchor, split into those reaching pixels after
+    # the source in raster order and those reaching pixels before it, each
+    # ordered so that a pixel gathers its sources in raster order
+    pI = kernel.shape[1] // 2
+    tapY, tapX, tapW = kernelTaps(kernel)
+    tapDY, tapDX = tapY - pI, tapX - pI
+    forward = (tapDY > 0) | ((tapDY == 0) & (tapDX > 0))
+    order = np.lexsort((-tapDX, -tapDY, ~forward))
+    return tapDY[order], tapDX[order], tapW[order], int(np.count_nonzero(forward))
+
+
+_compiledEngines = None
+_compileLock = threading.Lock()
+# numba's threading layer cannot run two parallel launches at once
+_wavefrontLock = threading.Lock()
+
+
+def compiledEngines():
+    # numba is only imported, and the engines compiled, on first use, which
+    # keeps it out of the start-up time of everything that does not diffuse
+    global _compiledEngines, prange
+    with _compileLock:
+        if _compiledEngines is None:
+            import numba
+            prange = numba.prange
+            _compiledEngines = (numba.njit(cache=True, nogil=True)(_errDiffScan), numba.njit(cache=True, nogil=True, parallel=True)(_errDiffWavefront))
+    return _compiledEngines
+
+
+def applyErrDiff(I, kernelFile, engine='auto', workers=1):
+    kernel = loadKernel(kernelFile)
+    kH, kW = kernel.shape
+
+    height, width = I.shape
+    pI = kW // 2
+
+    if engine == 'auto':
+        if not HAVE_NUMBA:
+            engine = 'numpy'
+        else:
+            engine = 'wavefront' if workers > 1 else 'numba'
+    if engine in ('numba', 'wavefront') and not HAVE_NUMBA:
+        raise RuntimeError('numba is not installed')
+
+    # a thread that finds the wavefront kernel busy falls back to the serial
+    # scan, which gives the same output
+    if engine == 'wavefront' and not _wavefrontLock.acquire(blocking=False):
+        engine = 'numba'
+    if engine == 'wavefront':
+        try:
+            tapDY, tapDX, tapW, nForward = wavefrontTaps(kernel)
+            out = np.zeros((height, width))
+            err = np.zeros((height, width))
+            errDiffWavefront = compiledEngines()[1]
+            import numba
+            numba.set_num_threads(max(1, min(workers, numba.config.NUMBA_NUM_THREADS)))
+            errDiffWavefront(np.ascontiguousarray(I, dtype=np.float64), tapDY, tapDX, tapW, nForward, max(64, pI + 1), out, err)
+        finally:
+            _wavefrontLock.release()
+        return out
+
+    tI = np.zeros((height + pI*2, width + pI*2))
+    tI[pI:-pI, pI:-pI] = I
+
+    tapY, tapX, tapW = kernelTaps(kernel)
+    if engine == 'numba':
+        compiledEngines()[0](tI, height, width, tapY, tapX, tapW)
+    else:
+        _errDiffRows(tI, height, width, tapY, tapX, tapW)
+
+    return tI[pI:-pI, pI:-pI]
+
+
+def applyErrDiffChannels(I, kernelFile, workers=1):
+    C = I.shape[2]
+    channels = [I[:, :, i] for i in range(C)]
+
+    if C == 1:
+        outputs = [applyErrDiff(channels[0], kernelFile, workers=workers)]
+    elif min(workers, C) <= 1:
+        outputs = (applyErrDiff(channel, kernelFile) for channel in channels)
+    elif HAVE_NUMBA:
+        # the compiled scan releases the GIL, so threads diffuse channels concurrently
+        with ThreadPoolExecutor(max_workers=min(workers, C)) as executor:
+            outputs = list(executor.map(applyErrDiff, channels, [kernelFile] * C))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, C)) as executor:
+            outputs = list(executor.map(applyErrDiff, channels, [kernelFile] * C))
+
+    halftone = np.empty(I.shape, dtype=np.uint8)
+    for i, output in enumerate(outputs):
+        halftone[:, :, i] = output * 255
+    return halftone
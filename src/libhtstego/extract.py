@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import os
+import zlib
+from contextlib import ExitStack
+import numpy as np
+from .halftone import halftoneBlocks
+from .payload import HEADER, messageLength, unpackPayload
+from .shares import PNGStreamReader
+
+# shares are read and searched this many rows at a time, a multiple of the
+# 3x3 blocks of pattern halftoning
+STRIP_HEIGHT = 48
+
+
+def htstego_pattern_extract(dirName, binary=False, cache=False):
+    if not os.path.exists(dirName):
+        return
+
+    return decodePayload(bitsToBytes(extractDirectory(dirName, extractPatternBlocks, cache)), binary)
+
+
+def shareFiles(dirName):
+    return [f'{dirName}/{file}' for file in os.listdir(dirName) if file.endswith('.png')]
+
+
+def loadShares(dirName):
+    from skimage import io
+
+    images = []
+    for carrier in shareFiles(dirName):
+        I = io.imread(carrier)
+        if len(I.shape) == 2:
+            I = np.expand_dims(I, axis=-1)
+        images.append(I)
+    return np.stack(images)
+
+
+def stackShares(shares):
+    # shares given as an (S, M, N) or (S, M, N, C) array, or as a list of
+    # arrays or of encoded images, such as the ones encode_shares returns
+    if isinstance(shares, np.ndarray):
+        return np.expand_dims(shares, axis=-1) if len(shares.shape) == 3 else shares
+
+    images = []
+    for share in shares:
+        if isinstance(share, (bytes, bytearray)):
+            from skimage import io as skio
+            share = skio.imread(io.BytesIO(share))
+        if len(share.shape) == 2:
+            share = np.expand_dims(share, axis=-1)
+        images.append(share)
+    return np.stack(images)
+
+
+def shareStrips(shares):
+    for y0 in range(0, shares.shape[1], STRIP_HEIGHT):
+        yield shares[:, y0:y0 + STRIP_HEIGHT]
+
+
+def readShareStrips(dirName):
+    # strips of the shares in a directory, decoded only as they are needed
+    with ExitStack() as stack:
+        readers = []
+        for file in shareFiles(dirName):
+            readers.append(PNGStreamReader(file))
+            stack.callback(readers[-1].close)
+        while readers and readers[0].rowsLeft:
+            yield np.stack([reader.read(STRIP_HEIGHT) for reader in readers])
+
+
+def extractStrips(strips, extractBits):
+    # payload bits are embedded in the order of the pixels, so they are
+    # extracted a strip at a time until as many as the payload header asks
+    # for are found; payloads without a header take every strip
+    chunks = []
+    found = 0
+    needed = None
+    for strip in strips:
+        chunks.append(extractBits(strip))
+        found += len(chunks[-1])
+        if needed is None and found >= HEADER.size * 8:
+            length = messageLength(bitsToBytes(np.concatenate(chunks)[:HEADER.size * 8]))
+            needed = 8 * length if length else 0
+        if needed and found >= needed:
+            return np.concatenate(chunks)[:needed]
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=bool)
+
+
+def extractDirectory(dirName, extractBits, cache=False):
+    if cache:
+        return extractStrips(shareStrips(cacheShares(dirName)), extractBits)
+    try:
+        return extractStrips(readShareStrips(dirName), extractBits)
+    except ValueError:
+        # images the strip reader does not support are decoded whole
+        return extractStrips(shareStrips(loadShares(dirName)), extractBits)
+
+
+def shareShape(file):
+    try:
+        reader = PNGStreamReader(file)
+    except ValueError:
+        from skimage import io
+        I = io.imread(file)
+        return I.shape if len(I.shape) == 3 else I.shape + (1,)
+    reader.close()
+    return reader.height, reader.width, reader.channels
+
+
+def decodeShare(file, share):
+    # decodes a share into share a strip at a time, or whole if the strip
+    # reader does not support it
+    try:
+        reader = PNGStreamReader(file)
+        try:
+            for y0 in range(0, reader.height, STRIP_HEIGHT):
+                share[y0:y0 + STRIP_HEIGHT] = reader.read(STRIP_HEIGHT)
+        finally:
+            reader.close()
+    except ValueError:
+        from skimage import io
+        share[:] = io.imread(file).reshape(share.shape)
+
+
+def cacheShares(dirName):
+    # the shares in a directory as a memory-mapped (S, M, N, C) stack, kept
+    # in a .npy file beside the directory; the shares are decoded into it one
+    # at a time, again only when the directory or a share is newer than it
+    files = shareFiles(dirName)
+    cacheFile = os.path.normpath(dirName) + '.npy'
+    newest = max([os.path.getmtime(dirName)] + [os.path.getmtime(file) for file in files])
+    if not os.path.exists(cacheFile) or os.path.getmtime(cacheFile) < newest:
+        shape = (len(files),) + (shareShape(files[0]) if files else (0, 0, 1))
+        tempFile = f'{cacheFile}.{os.getpid()}.tmp'
+        shares = np.lib.format.open_memmap(tempFile, mode='w+', dtype=np.uint8, shape=shape)
+        for share, file in zip(shares, files):
+            decodeShare(file, share)
+        shares.flush()
+        del shares
+        os.replace(tempFile, cacheFile)
+    return np.load(cacheFile, mmap_mode='r')
+
+
+def extractOddPixels(shares):
+    # every pixel that differs across shares carries one bit, given by the
+    # value only a single share has; zero wins when two shares disagree
+    differs = np.any(shares != shares[0], axis=0)
+    ones = np.count_nonzero(shares[:, differs], axis=0)
+    zeros = len(shares) - ones
+    odd = (zeros == 1) | (ones == 1)
+    return zeros[odd] != 1
+
+
+def extractPatternBlocks(shares):
+    # every 3x3 block whose pattern differs across shares carries one bit,
+    # 1 if the most common (smallest on ties) level is below the mean level
+    S, M, N, C = shares.shape
+    padded = np.zeros((S, -(-M // 3) * 3, -(-N // 3) * 3, C), dtype=np.uint8)
+    padded[:, :M, :N] = shares // 255
+    sums = halftoneBlocks(padded).sum(axis=(3, 4), dtype=np.int64)
+    differs = np.any(sums != sums[0], axis=0)
+    values = sums[:, differs]
+    mode = np.argmax(np.stack([np.count_nonzero(values == v, axis=0) for v in range(10)]), axis=0)
+    return mode < np.mean(values, axis=0)
+
+
+def bitsToBytes(bits):
+    # a trailing run of fewer than eight bits is read as a number of its own
+    nBytes = len(bits) // 8
+    msg = bytearray(np.packbits(bits[:nBytes * 8]).tobytes())
+    if len(bits) > nBytes * 8:
+        tail = bits[nBytes * 8:]
+        msg.append(int(np.packbits(tail)[0]) >> (8 - len(tail)))
+    return msg
+
+
+def decodePayload(msg, binary=False):
+    # a payload with a header ends where the header says it does; payloads
+    # embedded without one are decompressed if they can be. As text,
+    # payloads that are not valid UTF-8 cannot be extracted
+    try:
+        payload = unpackPayload(msg)
+    except (ValueError, zlib.error):
+        return None if binary else 'Cannot extract payload'
+    if payload is None:
+        try:
+            payload = zlib.decompress(bytes(msg))
+        except zlib.error:
+            payload = bytes(msg)
+    if binary:
+        return payload
+    try:
+        return payload.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'Cannot extract payload'
+
+
+def htstego_errdiff_extract(dirName, binary=False, cache=False):
+    if not os.path.exists(dirName):
+        return
+
+    return decodePayload(bitsToBytes(extractDirectory(dirName, extractOddPixels, cache)), binary)
+
+
+def htstego_ordered_extract(dirName, binary=False, cache=False):
+    if not os.path.exists(dirName):
+        return
+
+    return decodePayload(bitsToBytes(extractDirectory(dirName, extractOddPixels, cache)), binary)
+
+
+def htstego_errdiff_extract_shares(shares, binary=False):
+    return decodePayload(bitsToBytes(extractStrips(shareStrips(stackShares(shares)), extractOddPixels)), binary)
+
+
+def htstego_ordered_extract_shares(shares, binary=False):
+    return decodePayload(bitsToBytes(extractStrips(shareStrips(stackShares(shares)), extractOddPixels)), binary)
+
+
+def htstego_pattern_extract_shares(shares, binary=False):
+    return decodePayload(bitsToBytes(extractStrips(shareStrips(stackShares(shares)), extractPatternBlocks)), binary)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+
+def generateBayerMatrix(n):
+    if n == 1:
+        return np.array([[0]])
+    m = 4 * n * n * generateBayerMatrix(n / 2)
+    top = np.hstack((m, m + 3))
+    bottom = np.hstack((m + 2, m + 1))
+    return np.vstack((top, bottom)) / (4 * n * n)
+
+
+def findEmbedPositionErrDiff(currentSet, stegoPixel):
+    currentSet = np.ravel(currentSet)
+    if np.all(currentSet == stegoPixel):
+        return -1
+
+    while True:
+        embedHere = np.random.randint(0, len(currentSet))
+        if np.any(currentSet[embedHere] != stegoPixel):
+            break
+
+    return embedHere
+
+
+def findEmbedPositionsOrdered(messageBinary, blockSize, C, NSHARES):
+    # bit i goes to a random offset within the i-th run of blockSize pixels;
+    # the first offset is drawn below NSHARES, clamped to the first run so
+    # that small blocks still carry every bit
+    nBits = len(messageBinary)
+    offsets = np.random.randint(0, blockSize, nBits)
+    offsets[0] = np.random.randint(0, min(NSHARES, blockSize))
+    positions = np.arange(nBits) * blockSize + offsets
+    bits = messageBinary == 1
+    sP = np.where(bits, 255, 0)
+    rC = np.random.randint(0, C, nBits)
+    rO = np.random.randint(0, NSHARES, nBits)
+    return positions, sP, rC, rO
+
+
+def orderedThreshold(bayerN, y0, y1, N):
+    bM = np.multiply(generateBayerMatrix(bayerN), 4)
+    return bM.T[np.arange(y0, y1) % bayerN][:, np.arange(N) % bayerN]
+
+
+def findEmbedBlocksPat(levels, blockSize, nBits):
+    # every run of blockSize blocks carries the next bit in a random channel,
+    # unless all blocks of the run are fully black or white in that channel
+    nRuns = len(levels) // blockSize
+    C = levels.shape[1]
+    runChannel = np.random.randint(C, size=nRuns)
+    runLevels = levels.reshape(nRuns, blockSize, C)[np.arange(nRuns), :, runChannel]
+    eligible = (runLevels > 0) & (runLevels < 9)
+    usedRuns = np.flatnonzero(eligible.any(axis=1))[:nBits]
+
+    keys = np.random.random((len(usedRuns), blockSize))
+    keys[~eligible[usedRuns]] = -1
+    return usedRuns * blockSize + np.argmax(keys, axis=1), runChannel[usedRuns]
+
+
+def countBWBlocks(I):
+    cnt = np.count_nonzero(I == 0) + np.count_nonzero(I == 9)
+    return cnt
+
+
+PATMAP = np.array([[2, 0, 4], [7, 8, 5], [3, 6, 1]])
+
+
+PATTERNS = np.array([(PATMAP < p) * 255 for p in range(10)], dtype=np.uint8)
+
+
+def halftoneBlocks(inputMatrix):
+    # view of a (..., 3M, 3N, C) halftone as (..., M, N, 3, 3, C) 3x3 blocks
+    *lead, height, width, C = inputMatrix.shape
+    blocks = inputMatrix.reshape(*lead, height // 3, 3, width // 3, 3, C)
+    return np.swapaxes(blocks, -4, -3)
+
+
+def renderPatterns(I):
+    # (M, N, C) levels 0-9 to the (3M, 3N, C) halftone of their patterns
+    M, N, C = I.shape
+    return PATTERNS[I].transpose(0, 3, 1, 4, 2).reshape(M * 3, N * 3, C)
+
+
+def convertHalftoneToArray(inputMatrix, sHeight, sWidth):
+    blocks = inputMatrix.reshape(sHeight, 3, sWidth, 3, *inputMatrix.shape[2:])
+    return np.swapaxes(blocks, 0, 1).reshape(3, sHeight * sWidth * 3, *inputMatrix.shape[2:])
+
+
+def convertHalftoneToMatrix(inputMatrix, sWidth, sHeight):
+    blocks = inputMatrix.reshape(3, sHeight, sWidth, 3, *inputMatrix.shape[2:])
+    return np.swapaxes(blocks, 0, 1).reshape(sHeight * 3, sWidth * 3, *inputMatrix.shape[2:])
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import importlib.util
+
+HAVE_ZSTD = importlib.util.find_spec('zstandard') is not None
+
+# the compression levels each payload codec accepts
+CODEC_LEVELS = {'zlib': range(-1, 10), 'lzma': range(10), 'bz2': range(1, 10), 'zstd': range(1, 23)}
+
+
+class Options:
+    # run-time options of the embedding functions; every call is given its
+    # own options, so calls from several threads do not affect each other.
+    # Images are written to outputdir, or to a new timestamped directory
+    # under output when it is None. With profile set to 'time' or 'memory'
+    # every stage of an embedding is reported to profilehook. Payloads are
+    # embedded after a length and checksum header unless frame is False, one
+    # bit in every blocksize pixels (3x3 blocks for pattern halftoning), or
+    # spread over the whole cover when it is 0. With compress, payloads are
+    # compressed with codec at codeclevel, or at its default level if None.
+    # The paths of the images written are reported to outputhook
+    def __init__(self, nofileout=False, regularoutput=False, compress=False, workers=1, stripheight=0, pngworkers=1, pnglevel=6, metrics='full', outputdir=None, profile='none', profilehook=None, frame=True, blocksize=0, codec='zlib', codeclevel=None, outputhook=None):
+        if blocksize < 0:
+            raise ValueError('blocksize must not be negative')
+        if codec not in CODEC_LEVELS:
+            raise ValueError(f'unknown codec {codec}')
+        if codec == 'zstd' and not HAVE_ZSTD:
+            raise ValueError('the zstd codec needs the zstandard package')
+        if codeclevel is not None and codeclevel not in CODEC_LEVELS[codec]:
+            levels = CODEC_LEVELS[codec]
+            raise ValueError(f'{codec} compression level must be between {levels[0]} and {levels[-1]}')
+        if compress and not frame and codec != 'zlib':
+            raise ValueError(f'{codec} payloads cannot be embedded without a header')
+        self.nofileout = nofileout
+        self.regularoutput = regularoutput
+        self.compress = compress
+        self.workers = workers
+        self.stripheight = stripheight
+        self.pngworkers = pngworkers
+        self.pnglevel = pnglevel
+        self.metrics = metrics
+        self.outputdir = outputdir
+        self.profile = profile
+        self.profilehook = profilehook
+        self.frame = frame
+        self.blocksize = blocksize
+        self.codec = codec
+        self.codeclevel = codeclevel
+        self.outputhook = outputhook
+
+    def replace(self, **changes):
+        return Options(**{**vars(self), **changes})
+
+    def __repr__(self):
+        return 'Options(' + ', '.join(f'{name}={value!r}' for name, value in vars(self).items()) + ')'
+
+    @classmethod
+    def from_args(cls, args, parser=None):
+        # the options given on the command line with add_arguments; invalid
+        # combinations are reported through parser if it is given
+        try:
+            return cls(
+                nofileout=args.no_output_files,
+                regularoutput=args.generate_regular_output,
+                compress=args.compress_payload,
+                workers=args.workers,
+                stripheight=args.strip_height,
+                pngworkers=args.png_workers,
+                pnglevel=args.png_level,
+                metrics=args.metrics,
+                profile=args.profile,
+                frame=not args.raw_payload,
+                blocksize=args.block_size,
+                codec=args.codec,
+                codeclevel=args.codec_level
+            )
+        except ValueError as e:
+            if parser is None:
+                raise
+            parser.error(str(e))
+
+def nonNegative(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'must not be negative: {value}')
+    return number
+
+
+def add_arguments(parser, scope=None):
+    # the command line options of Options, shared by htstego.py and, with
+    # scope set to job or request, by htstego-batch.py and htstego-server.py;
+    # the performance and output option groups are returned for the options
+    # of each utility
+    each = f' in each {scope}' if scope else ''
+    codecs = [codec for codec in CODEC_LEVELS if codec != 'zstd' or HAVE_ZSTD]
+    args_performance = parser.add_argument_group('Performance Options')
+    args_performance.add_argument('--workers', type=int, default=1, help=f'number of threads used for halftoning and processes used for SSIM{each}')
+    args_performance.add_argument('--strip-height', type=int, default=0, help='read, halftone and write the images in strips of this many rows')
+    args_performance.add_argument('--png-workers', type=int, default=1, help='number of threads used for writing the output images')
+    args_performance.add_argument('--png-level', type=int, choices=range(10), default=6, metavar='{0..9}', help='PNG compression level')
+
+    args_output = parser.add_argument_group('Output Options')
+    args_output.add_argument('--no-output-files', action='store_true', help='do not produce output images')
+    args_output.add_argument('--generate-regular-output', action='store_true', help='generate nonstego output image')
+    args_output.add_argument('--metrics', type=str, choices=['none', 'fast', 'full'], default='full', help='quality metrics to compute (fast skips SSIM)')
+    args_output.add_argument('--profile', type=str, choices=['none', 'time', 'memory'], default='none', help='report the time (and peak memory) of every embedding stage')
+    if scope:
+        args_output.add_argument('--compress-payload', action='store_true', help=f'compress payloads of {scope}s that do not set compress_payload')
+        args_output.add_argument('--codec', type=str, choices=codecs, default='zlib', help=f'payload compression codec of {scope}s that do not set codec')
+        args_output.add_argument('--codec-level', type=int, help=f'payload compression level of {scope}s that do not set codec_level')
+    else:
+        args_output.add_argument('--compress-payload', action='store_true', help='compress payload before embedding')
+        args_output.add_argument('--codec', type=str, choices=codecs, default='zlib', help='payload compression codec (zstd needs the zstandard package)')
+        args_output.add_argument('--codec-level', type=int, help='payload compression level (the default of the codec if not given)')
+    args_output.add_argument('--raw-payload', action='store_true', help='embed payloads without a length and checksum header, as older versions did')
+    args_output.add_argument('--block-size', type=nonNegative, default=0, help='embed a payload bit in every run of this many pixels instead of spreading the payload over the whole cover')
+    return args_performance, args_output
@@ -18,9 +18,25 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-def init():
-    global nofileout
-    global regularoutput
-    global nostdout
-    global outputformat
-    global compress
+import json
+
+
+def output_formatter(params, output_format):
+    output = ''
+    if output_format == 'csv':
+        output += ','.join(name for name in params) + '\n'
+        output += ','.join(str(value) for value in params.values())
+    elif output_format == 'json':
+        output += json.dumps(params)
+    elif output_format == 'xml':
+        import xml.dom.minidom as minidom
+        md = minidom.Document()
+        xml_root = md.createElement('htstegoresult')
+        md.appendChild(xml_root)
+        for element_name, element_value in params.items():
+            xml_element = md.createElement(element_name)
+            xml_element.appendChild(md.createTextNode(str(element_value)))
+            xml_root.appendChild(xml_element)
+        output += md.toxml()
+
+    return output
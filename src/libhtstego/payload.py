@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import bz2
+import lzma
+import struct
+import sys
+import zlib
+import numpy as np
+from .options import HAVE_ZSTD
+
+# Embedded payloads start with a header: a magic number, the index in CODECS
+# of the codec the body is compressed with, the length of the body and its
+# CRC-32. Neither ASCII or UTF-8 text nor zlib data starts with the magic
+# number, so payloads embedded without a header are still told apart and
+# extracted.
+MAGIC = b'\x89H'
+HEADER = struct.Struct('>2sBII')
+CODECS = ('none', 'zlib', 'lzma', 'bz2', 'zstd')
+CHUNK_SIZE = 1 << 16
+
+
+def iterPayload(payloadFile):
+    # the payload in chunks, from bytes, a binary file object, a file name
+    # or - for the standard input
+    if isinstance(payloadFile, (bytes, bytearray)):
+        yield bytes(payloadFile)
+        return
+
+    if payloadFile == '-':
+        payloadFile = sys.stdin.buffer
+    file = payloadFile if hasattr(payloadFile, 'read') else open(payloadFile, 'rb')
+    try:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        if file is not payloadFile:
+            file.close()
+
+
+def compressor(codec, level=None):
+    # a compressor fed the payload a chunk at a time; level None is the
+    # default level of the codec
+    if codec == 'zlib':
+        return zlib.compressobj(-1 if level is None else level)
+    if codec == 'lzma':
+        return lzma.LZMACompressor(lzma.FORMAT_ALONE, preset=level)
+    if codec == 'bz2':
+        return bz2.BZ2Compressor(9 if level is None else level)
+    if codec == 'zstd':
+        if not HAVE_ZSTD:
+            raise RuntimeError('zstandard is not installed')
+        import zstandard
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    raise ValueError(f'unknown codec {codec}')
+
+
+def decompress(codec, body):
+    if codec == 'zlib':
+        return zlib.decompress(body)
+    if codec == 'lzma':
+        return lzma.decompress(body, lzma.FORMAT_ALONE)
+    if codec == 'bz2':
+        return bz2.decompress(body)
+    if codec == 'zstd':
+        if not HAVE_ZSTD:
+            raise RuntimeError('zstandard is not installed')
+        import zstandard
+        try:
+            return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        except zstandard.ZstdError as e:
+            raise ValueError('payload cannot be decompressed') from e
+    return body
+
+
+def packPayload(payloadFile, codec='none', level=None, frame=True):
+    # the payload as it is embedded, compressed while it is read, and the
+    # size of the payload itself; without a header only zlib can be told
+    # apart from an uncompressed payload
+    if not frame and codec not in ('none', 'zlib'):
+        raise ValueError(f'{codec} payloads cannot be embedded without a header')
+    encoder = compressor(codec, level) if codec != 'none' else None
+    body = bytearray()
+    size = 0
+    for chunk in iterPayload(payloadFile):
+        size += len(chunk)
+        body += encoder.compress(chunk) if encoder else chunk
+    if encoder:
+        body += encoder.flush()
+
+    if not frame:
+        return bytes(body), size
+    return HEADER.pack(MAGIC, CODECS.index(codec), len(body), zlib.crc32(body)) + body, size
+
+
+def readMessage(payloadFile, options):
+    # the bits to embed, most significant bit first, and the payload size
+    codec = options.codec if options.compress else 'none'
+    message, size = packPayload(payloadFile, codec, options.codeclevel, options.frame)
+    return np.unpackbits(np.frombuffer(message, dtype=np.uint8)), size
+
+
+def messageLength(msg):
+    # the length in bytes of a message that starts with a header, given at
+    # least its first HEADER.size bytes, or None if it has none
+    if len(msg) < HEADER.size or bytes(msg[:len(MAGIC)]) != MAGIC:
+        return None
+    return HEADER.size + HEADER.unpack_from(bytes(msg[:HEADER.size]))[2]
+
+
+def unpackPayload(msg):
+    # the payload of a message with a header, or None if it has none; a
+    # message whose header does not match its body cannot be extracted
+    if bytes(msg[:len(MAGIC)]) != MAGIC:
+        return None
+    if len(msg) < HEADER.size:
+        raise ValueError('payload header is incomplete')
+
+    _, codec, length, checksum = HEADER.unpack_from(bytes(msg[:HEADER.size]))
+    body = bytes(msg[HEADER.size:HEADER.size + length])
+    if codec >= len(CODECS) or len(body) != length or zlib.crc32(body) != checksum:
+        raise ValueError('payload does not match its header')
+    try:
+        return decompress(CODECS[codec], body)
+    except (zlib.error, lzma.LZMAError, OSError, RuntimeError) as e:
+        # RuntimeError: the codec is not installed here
+        raise ValueError('payload cannot be decompressed') from e
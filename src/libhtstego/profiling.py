@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# the stages of an embedding, and of one whose images are streamed in strips
+STAGES = ('read', 'halftone', 'embed', 'write', 'metrics')
+STREAM_STAGES = ('read', 'stream', 'metrics')
+
+# tracemalloc traces the whole process, so stages measuring their memory
+# take turns
+_memoryLock = threading.RLock()
+
+
+@contextmanager
+def stage(options, name):
+    # Reports how long a stage of an embedding took to options.profilehook,
+    # as hook(name, seconds, peakMemory). With profile='memory' the peak is
+    # the most memory allocated above the start of the stage, in bytes, in
+    # this process; otherwise it is None. Memory is traced for the whole
+    # process, so memory-profiled stages of concurrent calls in one process
+    # run one at a time.
+    if options.profile == 'none' or options.profilehook is None:
+        yield
+        return
+
+    if options.profile == 'memory':
+        with _memoryLock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] - base
+                if started:
+                    tracemalloc.stop()
+                options.profilehook(name, seconds, peak)
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        options.profilehook(name, time.perf_counter() - start, None)
+
+
+class StageRecorder:
+    # a profile hook that adds up the stages it is told about and passes
+    # them on to another hook, if one is given
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.times = {}
+        self.memory = {}
+
+    def __call__(self, name, seconds, peakMemory):
+        self.times[name] = self.times.get(name, 0) + seconds
+        if peakMemory is not None:
+            self.memory[name] = max(self.memory.get(name, 0), peakMemory)
+        if self.hook is not None:
+            self.hook(name, seconds, peakMemory)
+
+    def params(self, stages=None, memory=False):
+        # the recorded stages, or every one of stages, with N/A for those
+        # that did not run, so that all results have the same fields
+        if stages is None:
+            params = {f'time_{name}': round(seconds, 4) for name, seconds in self.times.items()}
+            params.update({f'memory_{name}': peak for name, peak in self.memory.items()})
+            return params
+        params = {f'time_{name}': round(self.times[name], 4) if name in self.times else 'N/A' for name in stages}
+        if memory:
+            params.update({f'memory_{name}': self.memory.get(name, 'N/A') for name in stages})
+        return params
+
+
+def profileStages(options, returnShares=False):
+    return STREAM_STAGES if options.stripheight > 0 and not returnShares else STAGES
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+from fractions import Fraction
+
+KERNEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernels')
+
+# the kernels shipped in the kernels directory, kept here so that they
+# need no file I/O; other kernels are read from that directory
+BUILTIN_KERNELS = {
+    'floyd': '''
+        0    0    0
+        0    X    7/16
+        3/16 5/16 1/16''',
+    'jajuni': '''
+        0    0    0    0    0
+        0    0    0    0    0
+        0    0    X    7/48 5/48
+        3/48 5/48 7/48 5/48 3/48
+        1/48 3/48 5/48 3/48 1/48''',
+    'stucki': '''
+        0    0    0    0    0
+        0    0    0    0    0
+        0    0    X    8/42 4/42
+        2/42 4/42 8/42 4/42 2/42
+        1/42 2/42 4/42 2/42 1/42'''
+}
+
+_kernelCache = {}
+
+
+def get_kernel_list():
+    kernel_list = list(BUILTIN_KERNELS)
+    if os.path.isdir(KERNEL_DIR):
+        for file in sorted(os.listdir(KERNEL_DIR)):
+            name = os.path.splitext(file)[0]
+            if file.endswith('.txt') and name not in kernel_list:
+                kernel_list.append(name)
+    return kernel_list
+
+
+def parseKernel(text):
+    # returns the kernel with its X moved to the centre, where the diffusion
+    # engines expect it
+    import numpy as np
+
+    rows = [line.split() for line in text.strip().splitlines()]
+    kernel = np.array([[float(Fraction(value)) if value != 'X' else 0 for value in row] for row in rows])
+    anchor = next((y, row.index('X')) for y, row in enumerate(rows) if 'X' in row)
+
+    kH, kW = kernel.shape
+    pI = max(anchor[0], anchor[1], kW - 1 - anchor[1], kH - 1 - anchor[0])
+    if kW != 2 * pI + 1 or anchor != (pI, pI):
+        centered = np.zeros((pI + kH - anchor[0], 2 * pI + 1))
+        centered[pI - anchor[0]:, pI - anchor[1]:pI - anchor[1] + kW] = kernel
+        kernel = centered
+    kernel.setflags(write=False)
+    return kernel
+
+
+def loadKernel(kernelFile):
+    if kernelFile not in _kernelCache:
+        if kernelFile in BUILTIN_KERNELS:
+            text = BUILTIN_KERNELS[kernelFile]
+        else:
+            with open(os.path.join(KERNEL_DIR, f'{kernelFile}.txt'), 'r') as file:
+                text = file.read()
+        _kernelCache[kernelFile] = parseKernel(text)
+    return _kernelCache[kernelFile]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import base64
+import json
+import os
+import socket
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .batch import startWorkers
+from .options import Options
+
+# extraction functions of each halftoning method, looked up by name in the
+# worker processes
+EXTRACTORS = {
+    'errdiff': 'htstego_errdiff_extract',
+    'ordered': 'htstego_ordered_extract',
+    'pattern': 'htstego_pattern_extract'
+}
+
+
+def _serverEmbed(job, options):
+    # covers and payloads are either file names on the server or inline
+    # base64 data, which is decoded and embedded without a temporary file
+    from .batch import htstego_job
+    from .shares import encode_shares, generateOutputDirectory
+
+    names = {'cover': job.get('cover', 'inline'), 'payload': job.get('payload', 'inline')}
+    job = dict(job)
+    for key in ('cover', 'payload'):
+        if f'{key}_data' in job:
+            job[key] = base64.b64decode(job.pop(f'{key}_data'))
+        elif key not in job:
+            raise ValueError(f'{key} or {key}_data is required')
+
+    # with return_shares the shares are sent back as base64 PNG images
+    # instead of being written to an output directory
+    if str(job.get('return_shares', False)).lower() in ('1', 'true', 'yes'):
+        params = htstego_job(job, options, returnShares=True)
+        shares = params.pop('shares')
+        params['shares_data'] = [] if shares is None else [base64.b64encode(png).decode('ascii') for png in encode_shares(shares, options.pnglevel, options.pngworkers)]
+    else:
+        outDir = None if options.nofileout else generateOutputDirectory(options.outputdir)
+        params = htstego_job(job, options.replace(outputdir=outDir))
+        params['output_dir'] = outDir
+    params['cover_file'] = names['cover']
+    params['payload_file'] = names['payload']
+    return params
+
+
+def _serverExtract(job):
+    # shares are read from a directory on the server or given inline as a
+    # list of base64 images; with binary the payload is sent back as base64
+    from . import extract
+
+    if job.get('htmethod') not in EXTRACTORS:
+        raise ValueError(f'unknown halftoning method {job.get("htmethod")}')
+    binary = str(job.get('binary', False)).lower() in ('1', 'true', 'yes')
+    if 'shares_data' in job:
+        shares = [base64.b64decode(share) for share in job['shares_data']]
+        payload = getattr(extract, f'{EXTRACTORS[job["htmethod"]]}_shares')(shares, binary)
+    elif 'extract_from' in job:
+        cache = str(job.get('cache', False)).lower() in ('1', 'true', 'yes')
+        payload = getattr(extract, EXTRACTORS[job['htmethod']])(job['extract_from'], binary, cache)
+    else:
+        raise ValueError('extract_from or shares_data is required')
+
+    if binary and payload is not None:
+        return {'payload_data': base64.b64encode(payload).decode('ascii')}
+    return {'payload': payload}
+
+
+class HTStegoRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'htstego'
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def sendJSON(self, status, body, headers={}):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self.sendJSON(404, {'error': f'unknown path {self.path}'})
+        self.sendJSON(200, {'status': 'ok', 'jobs': self.server.jobs, 'pending': self.server.pending, 'queue_size': self.server.queueSize})
+
+    def do_POST(self):
+        if self.path == '/embed':
+            task = (_serverEmbed, self.server.options)
+        elif self.path == '/extract':
+            task = (_serverExtract,)
+        else:
+            return self.sendJSON(404, {'error': f'unknown path {self.path}'})
+
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if not isinstance(job, dict):
+                raise ValueError('request body must be a JSON object')
+        except ValueError as e:
+            return self.sendJSON(400, {'error': f'invalid request: {e}'})
+
+        # requests beyond the running and queued ones are turned away at once
+        # instead of piling up behind a busy pool
+        if not self.server.acquire():
+            return self.sendJSON(503, {'error': 'server busy'}, {'Retry-After': '1'})
+        try:
+            result = self.server.executor.submit(task[0], job, *task[1:]).result()
+        except (KeyError, ValueError) as e:
+            return self.sendJSON(400, {'error': str(e)})
+        except Exception as e:
+            return self.sendJSON(500, {'error': str(e)})
+        finally:
+            self.server.release()
+        self.sendJSON(200, result)
+
+
+class HTStegoServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, jobs=1, queueSize=16, options=None):
+        self.jobs = jobs
+        self.queueSize = queueSize
+        self.options = options or Options()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = startWorkers(jobs)
+        super().__init__(address, HTStegoRequestHandler)
+
+    def acquire(self):
+        with self.lock:
+            if self.pending >= self.jobs + self.queueSize:
+                return False
+            self.pending += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.pending -= 1
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+
+class HTStegoUnixServer(HTStegoServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def htstego_server(host='127.0.0.1', port=8000, unixSocket=None, jobs=1, queueSize=16, options=None):
+    # an HTTP server with jobs warm worker processes; call serve_forever()
+    # on it to start handling requests
+    if unixSocket is not None:
+        return HTStegoUnixServer(unixSocket, jobs, queueSize, options)
+    return HTStegoServer((host, port), jobs, queueSize, options)
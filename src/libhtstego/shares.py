@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import multiprocessing
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+
+
+def snr(o, n):
+    ps = np.mean(o**2)
+    pn = np.mean((o - n)**2)
+    return 10 * np.log10(ps / pn)
+
+
+def coverSource(coverFile):
+    # covers and payloads are given as file names or inline as bytes
+    return io.BytesIO(coverFile) if isinstance(coverFile, (bytes, bytearray)) else coverFile
+
+
+def coverName(coverFile):
+    return 'cover' if isinstance(coverFile, (bytes, bytearray, np.ndarray)) else os.path.basename(coverFile).rsplit('.', 1)[0]
+
+
+def readCover(coverFile, as_gray=False):
+    # covers can also be given as arrays, the way io.imread returns them
+    if not isinstance(coverFile, np.ndarray):
+        from skimage import io
+        return io.imread(coverSource(coverFile), as_gray=as_gray)
+    if as_gray and len(coverFile.shape) > 2:
+        from skimage.color import rgb2gray, rgba2rgb
+        return rgb2gray(rgba2rgb(coverFile) if coverFile.shape[2] == 4 else coverFile)
+    return coverFile
+
+
+def shareImage(halftone, deltas, share):
+    # shares are kept as the halftone plus (share, flat pixel index, value)
+    # deltas and only materialized one at a time when they are written
+    shares, positions, values = deltas
+    stegoImage = halftone.copy()
+    stegoImage.reshape(-1)[positions[shares == share]] = values[shares == share]
+    return stegoImage
+
+
+def shareStack(halftone, deltas, NSHARES, outputMode):
+    # all shares at once, as an (S, M, N) or (S, M, N, C) array
+    shares, positions, values = deltas
+    stack = np.repeat(halftone[np.newaxis], NSHARES, axis=0)
+    stack.reshape(NSHARES, -1)[shares, positions] = values
+    return stack[:, :, :, 0] if outputMode == 'binary' else stack
+
+
+def shareMetrics(halftone, deltas, NSHARES, mode='full', workers=1):
+    # halftones are 0/255, so SNR and PSNR of a share only depend on how
+    # many pixels its deltas change; metrics that are not computed are nan
+    results = np.full((NSHARES, 3), np.nan)
+    if mode == 'none':
+        return results
+
+    shares, positions, values = deltas
+    # a later delta of a share overrides an earlier one on the same pixel
+    _, last = np.unique((shares * halftone.size + positions)[::-1], return_index=True)
+    last = len(shares) - 1 - last
+    changed = halftone.reshape(-1)[positions[last]] != values[last]
+    changed = np.bincount(shares[last][changed], minlength=NSHARES)
+    with np.errstate(divide='ignore'):
+        results[:, 0] = 10 * np.log10(np.count_nonzero(halftone) / changed)
+        results[:, 1] = 10 * np.log10(halftone.size / changed)
+
+    if mode == 'full':
+        if workers > 1 and NSHARES > 1:
+            # numba's worker threads do not survive a fork
+            context = multiprocessing.get_context('spawn') if 'numba' in sys.modules else None
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_initSSIMWorker, initargs=(halftone, deltas)) as executor:
+                results[:, 2] = list(executor.map(_workerSSIM, range(NSHARES)))
+        else:
+            results[:, 2] = [shareSSIM(halftone, deltas, i) for i in range(NSHARES)]
+    return results
+
+
+def shareSSIM(halftone, deltas, share):
+    from skimage import metrics
+
+    stegoImage = shareImage(halftone, deltas, share)
+    if halftone.shape[2] == 1:
+        return metrics.structural_similarity(stegoImage[:, :, 0], halftone[:, :, 0])
+    return metrics.structural_similarity(stegoImage, halftone, channel_axis=2)
+
+
+# the halftone and deltas of a metrics worker process, sent once per process
+_workerState = None
+
+
+def _initSSIMWorker(halftone, deltas):
+    global _workerState
+    _workerState = (halftone, deltas)
+
+
+def _workerSSIM(share):
+    return shareSSIM(*_workerState, share)
+
+
+def generateOutputDirectory(outputDir=None):
+    if outputDir is not None:
+        os.makedirs(outputDir, exist_ok=True)
+        return outputDir
+
+    os.makedirs('output', exist_ok=True)
+
+    currentDateTime = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
+    outputDirs = [d for d in os.listdir('output') if d.startswith(currentDateTime)]
+    num = max(int(d.split('-')[-1]) for d in outputDirs) + 1 if outputDirs else 0
+
+    # parallel jobs may race for the same name, so take the next free one
+    while True:
+        try:
+            os.makedirs(f'output/{currentDateTime}-{num}')
+            return f'output/{currentDateTime}-{num}'
+        except FileExistsError:
+            num += 1
+
+
+class PNGStreamWriter:
+    # writes an 8-bit PNG a strip of rows at a time
+    def __init__(self, path, height, width, channels, level=6):
+        # path can also be an open binary file, which is left open
+        self.file = open(path, 'wb') if isinstance(path, (str, os.PathLike)) else path
+        self.ownsFile = self.file is not path
+        self.compressor = zlib.compressobj(level)
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        colorType = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+        self.writeChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, colorType, 0, 0, 0))
+
+    def writeChunk(self, tag, data):
+        self.file.write(struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data)))
+
+    def write(self, rows):
+        rows = rows.reshape(rows.shape[0], -1)
+        data = np.hstack((np.zeros((rows.shape[0], 1), dtype=np.uint8), rows)).tobytes()
+        compressed = self.compressor.compress(data)
+        if compressed:
+            self.writeChunk(b'IDAT', compressed)
+
+    def close(self):
+        self.writeChunk(b'IDAT', self.compressor.flush())
+        self.writeChunk(b'IEND', b'')
+        if self.ownsFile:
+            self.file.close()
+
+
+class PNGStreamReader:
+    # reads an 8-bit PNG a strip of rows at a time, decompressing no more
+    # than it returns; interlaced images and the average and Paeth filters,
+    # which PNGStreamWriter never uses, are not supported
+    def __init__(self, path):
+        self.file = open(path, 'rb') if isinstance(path, (str, os.PathLike)) else path
+        self.ownsFile = self.file is not path
+        if self.file.read(8) != b'\x89PNG\r\n\x1a\n':
+            self.close()
+            raise ValueError('not a PNG file')
+        tag, data = self.readChunk()
+        width, height, bitDepth, colorType, _, _, interlace = struct.unpack('>IIBBBBB', data[:13])
+        if tag != b'IHDR' or bitDepth != 8 or colorType not in (0, 2, 4, 6) or interlace != 0:
+            self.close()
+            raise ValueError('unsupported PNG format')
+        self.height, self.width = height, width
+        self.channels = {0: 1, 4: 2, 2: 3, 6: 4}[colorType]
+        self.rowsLeft = height
+        self.decompressor = zlib.decompressobj()
+        self.buffer = bytearray()
+        self.previous = np.zeros(width * self.channels, dtype=np.uint8)
+
+    def readChunk(self):
+        length, tag = struct.unpack('>I4s', self.file.read(8))
+        data = self.file.read(length)
+        self.file.read(4)
+        return tag, data
+
+    def read(self, nRows):
+        # the next nRows rows (fewer at the end) as an (nRows, N, C) array
+        nRows = min(nRows, self.rowsLeft)
+        rowBytes = 1 + self.width * self.channels
+        size = nRows * rowBytes
+        while len(self.buffer) < size:
+            if self.decompressor.unconsumed_tail:
+                data = self.decompressor.unconsumed_tail
+            else:
+                tag, data = self.readChunk()
+                if tag == b'IEND':
+                    raise ValueError('PNG file is truncated')
+                if tag != b'IDAT':
+                    continue
+            self.buffer += self.decompressor.decompress(data, size - len(self.buffer))
+
+        rows = np.frombuffer(self.buffer, dtype=np.uint8, count=size).reshape(nRows, rowBytes).copy()
+        del self.buffer[:size]
+        filters, rows = rows[:, 0], rows[:, 1:]
+        self.rowsLeft -= nRows
+        if filters.any():
+            for i, filterType in enumerate(filters):
+                if filterType == 1:
+                    rows[i] = np.cumsum(rows[i].reshape(self.width, self.channels), axis=0, dtype=np.uint8).ravel()
+                elif filterType == 2:
+                    rows[i] += rows[i - 1] if i else self.previous
+                elif filterType != 0:
+                    raise ValueError(f'unsupported PNG filter {filterType}')
+        if nRows:
+            self.previous = rows[-1]
+        return rows.reshape(nRows, self.width, self.channels)
+
+    def close(self):
+        if self.ownsFile:
+            self.file.close()
+
+
+def savePNG(path, image, level=6):
+    channels = 1 if len(image.shape) == 2 else image.shape[2]
+    writer = PNGStreamWriter(path, image.shape[0], image.shape[1], channels, level)
+    writer.write(image)
+    writer.close()
+    return path
+
+
+def writeShares(halftone, deltas, stegoOutputPaths, outputMode, workers=1, level=6):
+    # zlib releases the GIL, so the shares are materialized and compressed
+    # in a thread pool, one share per thread at a time
+    def writeShare(i):
+        stegoImage = shareImage(halftone, deltas, i)
+        if outputMode == 'binary':
+            stegoImage = stegoImage[:, :, 0]
+        return savePNG(stegoOutputPaths[i], stegoImage, level)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(writeShare, range(len(stegoOutputPaths))))
+
+
+def encode_shares(shares, level=6, workers=1):
+    # PNG files of shares returned by the htstego_*_shares functions, as bytes
+    def encodeShare(share):
+        file = io.BytesIO()
+        savePNG(file, share, level)
+        return file.getvalue()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(encodeShare, shares))
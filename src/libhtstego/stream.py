@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+
+# libhtstego - Halftone Steganography Utility
+#
+# Copyright (C) 2024 by Efe Çiftci <efeciftci@cankaya.edu.tr>
+# Copyright (C) 2024 by Emre Sümer <esumer@baskent.edu.tr>
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from .errdiff import HAVE_NUMBA, _errDiffRows, compiledEngines, kernelTaps
+from .halftone import PATTERNS, countBWBlocks, findEmbedBlocksPat, findEmbedPositionErrDiff, findEmbedPositionsOrdered, halftoneBlocks, orderedThreshold, renderPatterns
+from .registry import loadKernel
+from .profiling import stage
+from .payload import readMessage
+from .shares import PNGStreamWriter, coverName, coverSource, generateOutputDirectory
+
+
+def openCover(coverFile):
+    # uncompressed TIFF covers and .npy arrays are memory-mapped, so strips
+    # are read from disk on demand; other formats are decoded in full
+    if isinstance(coverFile, np.ndarray):
+        return coverFile
+    if isinstance(coverFile, str) and coverFile.lower().endswith('.npy'):
+        return np.load(coverFile, mmap_mode='r')
+    if isinstance(coverFile, str) and coverFile.lower().endswith(('.tif', '.tiff')):
+        import tifffile
+        try:
+            return tifffile.memmap(coverFile, mode='r')
+        except ValueError:
+            pass
+    from skimage import io
+    return io.imread(coverSource(coverFile))
+
+
+def coverRows(cover, y0, y1, outputMode):
+    # rows y0 to y1 of a cover, converted the same way as io.imread does
+    rows = np.asarray(cover[y0:y1])
+    if outputMode == 'binary':
+        from skimage.color import rgb2gray, rgba2rgb
+        if len(rows.shape) > 2:
+            if rows.shape[2] == 4:
+                rows = rgba2rgb(rows)
+            rows = rgb2gray(rows)
+        return np.expand_dims(rows, axis=-1)
+    return rows / 255.0
+
+
+def iterErrDiffStrips(cover, outputMode, kernelFile, stripHeight):
+    # Diffuses the cover strip by strip. The rows below a strip that its
+    # error spills into are read ahead and carried over to the next strip,
+    # so the output equals that of applyErrDiff on the whole cover.
+    kernel = loadKernel(kernelFile)
+    kH, kW = kernel.shape
+    pI = kW // 2
+    below = kH - 1 - pI
+    tapY, tapX, tapW = kernelTaps(kernel)
+    scan = compiledEngines()[0] if HAVE_NUMBA else _errDiffRows
+
+    M, N = cover.shape[:2]
+    C = 1 if outputMode == 'binary' else cover.shape[2]
+    carry = None
+    for y0 in range(0, M, stripHeight):
+        h = min(stripHeight, M - y0)
+        tI = np.zeros((C, pI + h + below, N + 2 * pI))
+        start = 0
+        if carry is not None:
+            tI[:, pI:pI + below] = carry
+            start = below
+        y1 = min(M, y0 + h + below)
+        if y1 > y0 + start:
+            tI[:, pI + start:pI + y1 - y0, pI:pI + N] = np.moveaxis(coverRows(cover, y0 + start, y1, outputMode), 2, 0)
+
+        for c in range(C):
+            scan(tI[c], h, N, tapY, tapX, tapW)
+        carry = tI[:, pI + h:pI + h + below].copy()
+        yield (np.moveaxis(tI[:, pI:pI + h, pI:pI + N], 0, 2) * 255).astype(np.uint8)
+
+
+class StreamMetrics:
+    # SNR, PSNR and SSIM of every share accumulated over strips of rows. SSIM
+    # is evaluated on windows that keep the rows its 7x7 window reaches above
+    # each strip and is averaged over the same region as structural_similarity
+    def __init__(self, NSHARES, height, mode='full'):
+        self.mode = mode
+        self.height = height
+        self.row = 0
+        self.ssimRow = 3
+        self.signal = 0.0
+        self.noise = np.zeros(NSHARES)
+        self.squaredError = np.zeros(NSHARES)
+        self.ssimSum = np.zeros(NSHARES)
+        self.ssimCount = 0
+        self.normalTail = None
+        self.stegoTail = None
+
+    def update(self, normalRows, stegoRows):
+        if self.mode == 'none':
+            return
+        self.rowSize = normalRows[0].size
+        self.signal += np.sum(normalRows**2, dtype=np.float64)
+        for i, stegoImage in enumerate(stegoRows):
+            self.noise[i] += np.sum((normalRows - stegoImage)**2, dtype=np.float64)
+            self.squaredError[i] += np.sum((stegoImage.astype(np.float64) - normalRows)**2)
+
+        self.row += len(normalRows)
+        if self.mode != 'full':
+            return
+        if self.normalTail is not None:
+            normalRows = np.concatenate((self.normalTail, normalRows))
+            stegoRows = np.concatenate((self.stegoTail, stegoRows), axis=1)
+        start = self.row - len(normalRows)
+        lo, hi = max(self.ssimRow, start + 3), self.row - 3
+        if hi > lo and len(normalRows) >= 7:
+            from skimage import metrics
+            cA = None if len(normalRows.shape) == 2 else 2
+            for i, stegoImage in enumerate(stegoRows):
+                _, S = metrics.structural_similarity(stegoImage, normalRows, channel_axis=cA, full=True)
+                self.ssimSum[i] += np.sum(S[lo - start:hi - start, 3:-3])
+            self.ssimCount += S[lo - start:hi - start, 3:-3].size
+            self.ssimRow = hi
+
+        keep = max(0, self.ssimRow - 3 - start)
+        self.normalTail = normalRows[keep:]
+        self.stegoTail = stegoRows[:, keep:]
+
+    def results(self):
+        results = np.full((len(self.noise), 3), np.nan)
+        if self.mode == 'none':
+            return results
+        pixels = self.row * self.rowSize
+        results[:, 0] = 10 * np.log10((self.signal / pixels) / (self.noise / pixels))
+        results[:, 1] = 10 * np.log10(255**2 / (self.squaredError / pixels))
+        if self.mode == 'full':
+            results[:, 2] = self.ssimSum / self.ssimCount
+        return results
+
+
+class ShareStreamWriter:
+    # sends strips of the regular output and of every share to their PNG
+    # files and to the quality metrics
+    def __init__(self, NSHARES, height, width, channels, normalOutputPath, stegoOutputPaths, options):
+        self.channels = channels
+        self.metrics = StreamMetrics(NSHARES, height, options.metrics)
+        self.paths = ([] if normalOutputPath is None else [normalOutputPath]) + stegoOutputPaths
+        self.outputhook = options.outputhook
+        self.writers = []
+        if normalOutputPath is not None:
+            self.writers.append(PNGStreamWriter(normalOutputPath, height, width, channels, options.pnglevel))
+        self.writers += [PNGStreamWriter(path, height, width, channels, options.pnglevel) for path in stegoOutputPaths]
+
+    def write(self, normalRows, stegoRows):
+        if self.channels == 1:
+            normalRows = normalRows[:, :, 0]
+            stegoRows = stegoRows[:, :, :, 0]
+        rows = list(stegoRows)
+        if len(self.writers) > len(rows):
+            rows.insert(0, normalRows)
+        for writer, strip in zip(self.writers, rows):
+            writer.write(strip)
+        self.metrics.update(normalRows, stegoRows)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+        if self.paths and self.outputhook is not None:
+            self.outputhook(self.paths)
+        return self.metrics.results()
+
+
+def openShareStream(NSHARES, height, width, channels, coverFile, regularName, stegoName, options):
+    normalOutputPath = None
+    stegoOutputPaths = []
+    if options.nofileout == False:
+        outDir = generateOutputDirectory(options.outputdir)
+        imfile = coverName(coverFile)
+        if options.regularoutput == True:
+            normalOutputPath = f'{outDir}/{imfile}_{regularName}.png'
+        stegoOutputPaths = [f'{outDir}/{imfile}_{stegoName.format(i + 1)}.png' for i in range(NSHARES)]
+    return ShareStreamWriter(NSHARES, height, width, channels, normalOutputPath, stegoOutputPaths, options)
+
+
+def htstego_errdiff_stream(NSHARES, coverFile, payloadFile, errDiffMethod, outputMode, options):
+    # the strips are read, halftoned, embedded into and written in turn, so
+    # all of that is profiled as a single stream stage
+    with stage(options, 'read'):
+        cover = openCover(coverFile)
+        if outputMode == 'color' and len(cover.shape) < 3:
+            return 'cannot generate color output from grayscale input', 0, 0, 0
+
+        M, N = cover.shape[:2]
+        C = 1 if outputMode == 'binary' else cover.shape[2]
+
+        messageBinary, payloadBytes = readMessage(payloadFile, options)
+
+    blockSize = M * N // len(messageBinary)
+    if blockSize == 0:
+        return 'payload too long', 0, 0, 0
+    blockSize = min(blockSize, options.blocksize or blockSize)
+
+    with stage(options, 'stream'):
+        output = openShareStream(NSHARES, M, N, C, coverFile, f'hterrdiff{outputMode[:3]}_regular_{errDiffMethod}', f'hterrdiff{outputMode[:3]}_stego_msg{payloadBytes}_{{}}of{NSHARES}_{errDiffMethod}', options)
+
+        # halftone rows are held back until every run of blockSize pixels that
+        # overlaps them has been embedded into
+        pending = np.zeros((0, N, C), dtype=np.uint8)
+        pendingRow = 0
+        stegoPixels = (messageBinary * 255).tolist()
+        embedded = []
+        i = 0
+        messagePos = 0
+        for strip in iterErrDiffStrips(cover, outputMode, errDiffMethod, options.stripheight):
+            pending = np.concatenate((pending, strip))
+            linearImage = pending.reshape(-1, C)
+            available = (pendingRow + len(pending)) * N
+            while messagePos < len(messageBinary) and i + blockSize - 1 <= M * N and min(i + blockSize, M * N) <= available:
+                stegoPixel = stegoPixels[messagePos]
+                randomChannel = np.random.randint(C)
+                currentBlock = linearImage[i - pendingRow * N:i - pendingRow * N + blockSize, randomChannel]
+                embedHere = findEmbedPositionErrDiff(currentBlock, stegoPixel)
+                if embedHere != -1:
+                    embedded.append((np.random.randint(NSHARES), i + embedHere, randomChannel, stegoPixel))
+                    messagePos += 1
+                i += blockSize
+
+            done = messagePos >= len(messageBinary) or i + blockSize - 1 > M * N
+            flushRow = pendingRow + len(pending) if done else min(pendingRow + len(pending), i // N)
+            normalRows = pending[:flushRow - pendingRow]
+            stegoRows = np.repeat(normalRows[np.newaxis], NSHARES, axis=0)
+            for share, pos, channel, stegoPixel in [e for e in embedded if e[1] < flushRow * N]:
+                stegoRows[share, pos // N - pendingRow, pos % N, channel] = stegoPixel
+            embedded = [e for e in embedded if e[1] >= flushRow * N]
+            if len(normalRows):
+                output.write(normalRows, stegoRows)
+            pending = pending[flushRow - pendingRow:]
+            pendingRow = flushRow
+
+    with stage(options, 'metrics'):
+        results = output.close()
+    # the images are already written, but without the whole payload
+    if messagePos < len(messageBinary):
+        return 'payload too long', 0, 0, 0
+    return 'ok', np.mean(results[:, 0]), np.mean(results[:, 1]), np.mean(results[:, 2])
+
+
+def htstego_ordered_stream(NSHARES, coverFile, payloadFile, bayerN, outputMode, options):
+    with stage(options, 'read'):
+        cover = openCover(coverFile)
+        if outputMode == 'color' and len(cover.shape) < 3:
+            return 'cannot generate color output from grayscale input', 0, 0, 0
+
+        M, N = cover.shape[:2]
+        C = 1 if outputMode == 'binary' else cover.shape[2]
+
+        messageBinary, payloadBytes = readMessage(payloadFile, options)
+
+    blockSize = M * N // len(messageBinary)
+    if blockSize == 0:
+        return 'payload too long', 0, 0, 0
+    blockSize = min(blockSize, options.blocksize or blockSize)
+
+    with stage(options, 'stream'):
+        output = openShareStream(NSHARES, M, N, C, coverFile, f'htordered{outputMode[:3]}_regular_bayer{bayerN}', f'htordered{outputMode[:3]}_stego_msg{payloadBytes}_{{}}of{NSHARES}_bayer{bayerN}', options)
+        positions, sP, rC, rO = findEmbedPositionsOrdered(messageBinary, blockSize, C, NSHARES)
+
+        for y0 in range(0, M, options.stripheight):
+            y1 = min(M, y0 + options.stripheight)
+            I = coverRows(cover, y0, y1, outputMode)
+            normalRows = np.where(I > orderedThreshold(bayerN, y0, y1, N)[:, :, np.newaxis], 255, 0).astype(np.uint8)
+            stegoRows = np.repeat(normalRows[np.newaxis], NSHARES, axis=0)
+            first, last = np.searchsorted(positions, [y0 * N, y1 * N])
+            inStrip = positions[first:last] - y0 * N
+            stegoRows[:, inStrip // N, inStrip % N, rC[first:last]] = np.where(np.arange(NSHARES)[:, np.newaxis] == rO[first:last], sP[first:last], 255 - sP[first:last])
+            output.write(normalRows, stegoRows)
+
+    with stage(options, 'metrics'):
+        results = output.close()
+    return 'ok', np.mean(results[:, 0]), np.mean(results[:, 1]), np.mean(results[:, 2])
+
+
+def patternRows(cover, y0, y1, outputMode):
+    if outputMode == 'binary':
+        return (coverRows(cover, y0, y1, outputMode) * 255).astype(np.uint8) // 26
+    return np.asarray(cover[y0:y1]) // 26
+
+
+def htstego_pattern_stream(NSHARES, coverFile, payloadFile, outputMode, options):
+    with stage(options, 'read'):
+        cover = openCover(coverFile)
+        M, N = cover.shape[:2]
+        C = 1 if outputMode == 'binary' else cover.shape[2]
+        stripHeight = options.stripheight
+
+        messageBinary, payloadBytes = readMessage(payloadFile, options)
+
+    nrOfBlocks = M * N
+    bwBlocks = sum(countBWBlocks(patternRows(cover, y0, y0 + stripHeight, outputMode)) for y0 in range(0, M, stripHeight))
+    nrOfUsableBlocks = nrOfBlocks - bwBlocks
+    blockSize = nrOfUsableBlocks // len(messageBinary)
+    if blockSize == 0:
+        return 'payload too long', 0, 0, 0
+    blockSize = min(blockSize, options.blocksize or blockSize)
+
+    with stage(options, 'stream'):
+        output = openShareStream(NSHARES, M * 3, N * 3, C, coverFile, f'htpat{outputMode[:3]}_regular', f'htpat{outputMode[:3]}_stego_msg{payloadBytes}_{{}}of{NSHARES}', options)
+
+        # level rows are held back until every run of blockSize blocks that
+        # overlaps them has been embedded into
+        pending = np.zeros((0, N, C), dtype=np.uint8)
+        pendingRow = 0
+        embedded = np.zeros((0, 4), dtype=np.int64)
+        i = 0
+        messagePos = 0
+        for y0 in range(0, M, stripHeight):
+            pending = np.concatenate((pending, patternRows(cover, y0, y0 + stripHeight, outputMode)))
+            available = (pendingRow + len(pending)) * N
+            complete = (available - i) // blockSize if available < nrOfBlocks else -(-(available - i) // blockSize)
+            if messagePos < len(messageBinary) and complete > 0:
+                levels = np.zeros((complete * blockSize, C), dtype=np.uint8)
+                runs = pending.reshape(-1, C)[i - pendingRow * N:i - pendingRow * N + complete * blockSize]
+                levels[:len(runs)] = runs
+                embedBlocks, embedChannels = findEmbedBlocksPat(levels, blockSize, len(messageBinary) - messagePos)
+                bits = messageBinary[messagePos:messagePos + len(embedBlocks)] == 1
+                newLevels = levels[embedBlocks, embedChannels] + np.where(bits, 1, -1)
+                shares = np.random.randint(NSHARES, size=len(embedBlocks))
+                embedded = np.concatenate((embedded, np.stack((shares, i + embedBlocks, embedChannels, newLevels), axis=1)))
+                messagePos += len(embedBlocks)
+                i += complete * blockSize
+
+            done = messagePos >= len(messageBinary) or i >= nrOfBlocks
+            flushRow = pendingRow + len(pending) if done else min(pendingRow + len(pending), i // N)
+            levelRows = pending[:flushRow - pendingRow]
+            if len(levelRows):
+                normalRows = renderPatterns(levelRows)
+                stegoRows = np.repeat(normalRows[np.newaxis], NSHARES, axis=0)
+                flushed = embedded[:, 1] < flushRow * N
+                shares, blocks, channels, newLevels = embedded[flushed].T
+                halftoneBlocks(stegoRows)[shares, blocks // N - pendingRow, blocks % N, :, :, channels] = PATTERNS[newLevels]
+                embedded = embedded[~flushed]
+                output.write(normalRows, stegoRows)
+            pending = pending[flushRow - pendingRow:]
+            pendingRow = flushRow
+
+    with stage(options, 'metrics'):
+        results = output.close()
+    # the images are already written, but without the whole payload
+    if messagePos < len(messageBinary):
+        return 'payload too long', 0, 0, 0
+    return 'ok', np.mean(results[:, 0]), np.mean(results[:, 1]), np.mean(results[:, 2])